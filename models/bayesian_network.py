@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Discrete Bayesian Network Engine
+
+A small Bayesian-network subsystem for the reform predictor: nodes and
+edges are declared with their conditional probability tables stored as
+NumPy arrays, and exact queries are answered by variable elimination.
+
+Each CPT is a factor with one axis per parent plus one for the node itself.
+A query conditions the factors on the evidence, drops nodes that cannot
+affect the answer (neither ancestors of the target nor of the evidence)
+and contracts the remaining factors with `np.einsum`. Its optimizer picks
+the pairwise elimination order, so cost grows with the largest
+intermediate factor rather than with 2^N as in full enumeration.
+
+Author: Adrian Lerer
+Date: 2025-10-17
+"""
+
+import string
+import time
+
+import numpy as np
+from typing import Dict, List, Optional, Sequence
+
+# einsum subscripts: one letter per variable in a query
+_SUBSCRIPTS = string.ascii_letters
+
+
+class BayesianNetwork:
+    """
+    Discrete Bayesian network with NumPy factor tables.
+
+    Example:
+        net = BayesianNetwork()
+        net.add_binary_node('rain', 0.2)
+        net.add_binary_node('wet', [0.1, 0.9], parents=['rain'])
+        net.probability('rain', evidence={'wet': 1})
+    """
+
+    def __init__(self):
+        self.nodes: Dict[str, Dict] = {}
+
+    def add_node(self, name: str, cpt, parents: Sequence[str] = (),
+                 states: Optional[Sequence[str]] = None) -> 'BayesianNetwork':
+        """
+        Add a node with its conditional probability table.
+
+        Args:
+            name: Node name
+            cpt: Array of shape (card(parent_1), ..., card(parent_k), card(node))
+                whose last axis sums to 1
+            parents: Names of parent nodes (must already exist)
+            states: Optional state labels (defaults to 0..card-1)
+
+        Returns:
+            The network, so calls can be chained
+        """
+        if name in self.nodes:
+            raise ValueError(f"Node already defined: {name}")
+        missing = [parent for parent in parents if parent not in self.nodes]
+        if missing:
+            raise ValueError(f"Unknown parents of {name}: {missing}")
+
+        cpt = np.asarray(cpt, dtype=float)
+        expected = tuple(self.nodes[parent]['cardinality'] for parent in parents)
+        if cpt.ndim != len(parents) + 1 or cpt.shape[:-1] != expected:
+            raise ValueError(f"CPT of {name} has shape {cpt.shape}, expected {expected} + (states,)")
+        if not np.allclose(cpt.sum(axis=-1), 1.0):
+            raise ValueError(f"CPT of {name} does not sum to 1 over the node states")
+
+        self.nodes[name] = {
+            'parents': tuple(parents),
+            'cpt': cpt,
+            'cardinality': cpt.shape[-1],
+            'states': tuple(states) if states is not None else tuple(range(cpt.shape[-1]))
+        }
+        return self
+
+    def add_binary_node(self, name: str, prob_true, parents: Sequence[str] = ()) -> 'BayesianNetwork':
+        """
+        Add a binary node (state 1 = True) from P(True | parents).
+
+        Args:
+            prob_true: Scalar for a root node, or an array of shape
+                (card(parent_1), ..., card(parent_k)) of P(True | parents)
+        """
+        prob_true = np.asarray(prob_true, dtype=float)
+        return self.add_node(name, np.stack([1 - prob_true, prob_true], axis=-1),
+                             parents, states=(False, True))
+
+    @property
+    def edges(self) -> List[tuple]:
+        return [(parent, name) for name, node in self.nodes.items() for parent in node['parents']]
+
+    def _ancestors(self, names) -> set:
+        """The given nodes and all of their ancestors."""
+        relevant, stack = set(), list(names)
+        while stack:
+            name = stack.pop()
+            if name not in relevant:
+                relevant.add(name)
+                stack.extend(self.nodes[name]['parents'])
+        return relevant
+
+    def _state_index(self, name: str, state) -> int:
+        states = self.nodes[name]['states']
+        if state in states:
+            return states.index(state)
+        if isinstance(state, (int, np.integer)) and 0 <= state < len(states):
+            return int(state)
+        raise ValueError(f"Unknown state {state!r} of node {name}")
+
+    def query(self, target: str, evidence: Optional[Dict] = None) -> np.ndarray:
+        """
+        Exact posterior distribution of a node given evidence.
+
+        Args:
+            target: Node to query
+            evidence: Observed states, {node: state label or index}
+
+        Returns:
+            Array of P(target = s | evidence) over the target states
+        """
+        evidence = dict(evidence or {})
+        unknown = [name for name in [target, *evidence] if name not in self.nodes]
+        if unknown:
+            raise KeyError(f"Unknown nodes: {unknown}")
+        if target in evidence:
+            result = np.zeros(self.nodes[target]['cardinality'])
+            result[self._state_index(target, evidence[target])] = 1.0
+            return result
+
+        # Barren nodes (not ancestors of the target or evidence) sum out to 1
+        relevant = [name for name in self.nodes if name in self._ancestors([target, *evidence])]
+        free = [name for name in relevant if name not in evidence]
+        if len(free) > len(_SUBSCRIPTS):
+            raise ValueError(f"Query involves {len(free)} unobserved nodes; "
+                             f"at most {len(_SUBSCRIPTS)} are supported")
+        letters = dict(zip(free, _SUBSCRIPTS))
+
+        factors, subscripts = [], []
+        for name in relevant:
+            node = self.nodes[name]
+            variables = [*node['parents'], name]
+            # Condition the factor on observed variables by slicing their axes
+            index = tuple(self._state_index(var, evidence[var]) if var in evidence else slice(None)
+                          for var in variables)
+            factors.append(node['cpt'][index])
+            subscripts.append(''.join(letters[var] for var in variables if var not in evidence))
+
+        expression = f"{','.join(subscripts)}->{letters[target]}"
+        unnormalized = np.einsum(expression, *factors, optimize='greedy')
+        total = unnormalized.sum()
+        if total <= 0:
+            raise ValueError("Evidence has zero probability")
+        return unnormalized / total
+
+    def probability(self, target: str, state=True, evidence: Optional[Dict] = None) -> float:
+        """P(target = state | evidence)."""
+        return float(self.query(target, evidence)[self._state_index(target, state)])
+
+
+def random_network(n_nodes: int, max_parents: int = 3, seed: int = 0) -> BayesianNetwork:
+    """Random binary network for benchmarking (each node draws up to max_parents parents)."""
+    rng = np.random.default_rng(seed)
+    net = BayesianNetwork()
+    for i in range(n_nodes):
+        k = min(i, rng.integers(0, max_parents + 1))
+        parents = [f'X{j}' for j in sorted(rng.choice(i, size=k, replace=False))] if k else []
+        net.add_binary_node(f'X{i}', rng.random((2,) * len(parents)), parents)
+    return net
+
+
+def main():
+    """Benchmark exact queries on random networks"""
+    for n_nodes in (5, 10, 15, 20, 30):
+        net = random_network(n_nodes)
+        target = f'X{n_nodes - 1}'
+        evidence = {'X0': True}
+
+        start = time.perf_counter()
+        prob = net.probability(target, evidence=evidence)
+        elapsed = time.perf_counter() - start
+        print(f"{n_nodes:3d} nodes: P({target} | X0) = {prob:.4f}  ({elapsed*1000:.2f} ms)")
+
+
+if __name__ == '__main__':
+    main()
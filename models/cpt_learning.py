@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Learning the Reform Success CPT from the Historical Reforms Database
+
+Encodes the 23 reform attempts in `data/historical_reforms_database.csv`
+into the five parent-node states of `MileiReformPredictor` and estimates
+P(success | parents) per CPT cell. Each cell has a Beta (two-outcome
+Dirichlet) prior centered on the hand-specified CPT, so cells without
+historical observations keep the expert value and observed cells are
+pulled toward their empirical success rate.
+
+Counts are sufficient statistics: appending a reform updates a single
+cell in O(1), so the model can be refit whenever the database changes.
+
+Author: Adrian Lerer
+Date: 2025-10-17
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, Optional
+
+from milei_reform_bayesian_predictor import (
+    ConditionalProbabilityTable, MileiReformPredictor, NODE_NAMES
+)
+from reforms_data import load_reforms, parse_reforms
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         '..', 'data', 'historical_reforms_database.csv')
+
+# Years with a recession or macroeconomic crisis in Argentina
+CRISIS_YEARS = frozenset({1995, 1998, 1999, 2000, 2001, 2002, 2009, 2014,
+                          2016, 2018, 2019, 2020, 2023, 2024})
+
+# Years in which the CSJN composition changed substantially
+# (1990 court expansion under Menem, 2003-2005 renewal under Kirchner)
+CSJN_CHANGE_YEARS = frozenset({1990, 1991, 2003, 2004, 2005})
+
+# union_response wording that indicates a non-adversarial union stance
+COOPERATIVE_UNION_TERMS = ('acquiescence', 'support', 'negotiated')
+
+# legislative_outcome wording for instruments that were enacted or issued
+ENACTED_TERMS = ('approved', 'issued', 'negotiated')
+
+
+def encode_reforms(df: pd.DataFrame, partial_credit: float = 0.0,
+                   crisis_years: Iterable[int] = CRISIS_YEARS,
+                   csjn_change_years: Iterable[int] = CSJN_CHANGE_YEARS) -> pd.DataFrame:
+    """
+    Encode reform rows into the five node states and a success score.
+
+    `df` is the reforms database, raw or with the typed columns of
+    reforms_data.parse_reforms (added here if missing). Predicted rows (legislative_outcome 'Future') and anti-reform rows
+    (reversal_mechanism marked 'anti-reform') are dropped.
+
+    Node encoding:
+        legislative_majority: the instrument was approved, issued or negotiated
+        csjn_change: the reform year is in `csjn_change_years`
+        union_cooperative: union_response mentions acquiescence, support or
+            negotiation
+        constitutional_challenge: the typed challenge_filed column
+        economic_crisis: the reform year is in `crisis_years`
+
+    Success score: 1 for outcome 'Success', `partial_credit` for 'Partial',
+    0 otherwise.
+
+    Returns:
+        DataFrame with reform_id, one boolean column per node and 'success'
+    """
+    if 'outcome' not in df.columns:
+        df = parse_reforms(df)
+    legislative = df['legislative_outcome'].fillna('').str.lower()
+    keep = (legislative != 'future') & ~df['anti_reform']
+
+    df = df[keep]
+    legislative = legislative[keep]
+    union = df['union_response'].fillna('').str.lower()
+
+    encoded = pd.DataFrame({
+        'reform_id': df['reform_id'],
+        'legislative_majority': legislative.str.startswith(ENACTED_TERMS),
+        'csjn_change': df['year'].isin(list(csjn_change_years)),
+        'union_cooperative': union.str.contains('|'.join(COOPERATIVE_UNION_TERMS)),
+        'constitutional_challenge': df['challenge_filed'].to_numpy(dtype=bool),
+        'economic_crisis': df['year'].isin(list(crisis_years)),
+        'success': np.select([df['outcome'].eq('Success'), df['outcome'].eq('Partial')],
+                             [1.0, partial_credit], default=0.0)
+    })
+
+    return encoded.reset_index(drop=True)
+
+
+class CPTLearner:
+    """
+    Beta-smoothed estimates of P(success | parents) from reform counts.
+
+    The posterior mean of cell c is
+
+        (prior_strength * prior_c + successes_c) / (prior_strength + trials_c)
+
+    where prior_c is the hand-specified CPT entry.
+    """
+
+    def __init__(self, prior_cpt: np.ndarray, prior_strength: float = 2.0,
+                 partial_credit: float = 0.0,
+                 crisis_years: Iterable[int] = CRISIS_YEARS,
+                 csjn_change_years: Iterable[int] = CSJN_CHANGE_YEARS):
+        self.prior_cpt = np.array(prior_cpt, dtype=float)
+        self.prior_strength = prior_strength
+        self.partial_credit = partial_credit
+        self.crisis_years = frozenset(crisis_years)
+        self.csjn_change_years = frozenset(csjn_change_years)
+
+        self.trials = np.zeros_like(self.prior_cpt)
+        self.successes = np.zeros_like(self.prior_cpt)
+        self._bit_weights = 1 << np.arange(len(NODE_NAMES) - 1, -1, -1)
+
+    @classmethod
+    def from_model(cls, model: MileiReformPredictor, **kwargs) -> 'CPTLearner':
+        """Learner whose prior is the model's current CPT."""
+        return cls(model.cpt_success.values, **kwargs)
+
+    def _encode(self, df: pd.DataFrame) -> pd.DataFrame:
+        return encode_reforms(df, self.partial_credit, self.crisis_years,
+                              self.csjn_change_years)
+
+    def fit(self, df: pd.DataFrame) -> 'CPTLearner':
+        """Reset the counts and fit them from a reforms DataFrame."""
+        encoded = self._encode(df)
+        cells = encoded[NODE_NAMES].to_numpy(dtype=bool) @ self._bit_weights
+        n_cells = self.prior_cpt.size
+
+        self.trials = np.bincount(cells, minlength=n_cells).astype(float)
+        self.successes = np.bincount(cells, weights=encoded['success'], minlength=n_cells)
+        return self
+
+    def fit_csv(self, path: str = DATA_PATH, db_path: Optional[str] = None) -> 'CPTLearner':
+        """
+        Fit from the reforms database CSV (parsed by reforms_data.load_reforms),
+        or from the SQLite reforms store at `db_path` if given.
+        """
+        return self.fit(load_reforms(path, db_path=db_path).frame)
+
+    def update(self, row: Dict) -> Optional[int]:
+        """
+        Add one reform (a dict or Series with the CSV columns) to the counts.
+
+        Returns:
+            The CPT cell that was updated, or None if the row is not an
+            observed reform attempt
+        """
+        encoded = self._encode(pd.DataFrame([dict(row)]))
+        if encoded.empty:
+            return None
+
+        cell = int(encoded.loc[0, NODE_NAMES].to_numpy(dtype=bool) @ self._bit_weights)
+        self.trials[cell] += 1
+        self.successes[cell] += encoded.loc[0, 'success']
+        return cell
+
+    @property
+    def cpt(self) -> np.ndarray:
+        """Posterior mean CPT (flat, first node = most significant bit)."""
+        return ((self.prior_strength * self.prior_cpt + self.successes) /
+                (self.prior_strength + self.trials))
+
+    @property
+    def n_attempts(self) -> int:
+        return int(self.trials.sum())
+
+    @property
+    def base_rate(self) -> float:
+        """Observed success rate over all encoded attempts."""
+        return self.successes.sum() / self.n_attempts if self.n_attempts else 0.0
+
+    def posterior_prior(self, prior_mean: float) -> float:
+        """Beta posterior mean of the overall success rate for a prior mean."""
+        return ((self.prior_strength * prior_mean + self.successes.sum()) /
+                (self.prior_strength + self.n_attempts))
+
+    def apply(self, model: MileiReformPredictor) -> MileiReformPredictor:
+        """Write the learned CPT, base rate and prior into a model."""
+        model.bayesian_prior = self.posterior_prior(model.bayesian_prior)
+        model.historical_base_rate = self.base_rate
+        model.cpt_success.values[:] = self.cpt
+        return model
+
+    def summary(self) -> pd.DataFrame:
+        """Per-cell prior, counts and posterior for the observed cells."""
+        states = ConditionalProbabilityTable(len(NODE_NAMES)).states
+        table = pd.DataFrame({
+            **{name: states[:, i] for i, name in enumerate(NODE_NAMES)},
+            'prior': self.prior_cpt,
+            'trials': self.trials,
+            'successes': self.successes,
+            'posterior': self.cpt
+        })
+        return table[table['trials'] > 0].reset_index(drop=True)
+
+
+def main():
+    """Fit the CPT from the historical database and report the changes."""
+    parser = argparse.ArgumentParser(description='Learn the reform success CPT from the historical reforms')
+    parser.add_argument('--db', metavar='SQLITE',
+                        help='Read the reforms from this reforms_store file instead of the CSV')
+    args = parser.parse_args()
+
+    model = MileiReformPredictor(reforms_db=args.db)
+    learner = CPTLearner.from_model(model).fit_csv(db_path=args.db)
+
+    print(f"Encoded attempts: {learner.n_attempts}")
+    print(f"Historical base rate: {learner.base_rate*100:.1f}%")
+    print(learner.summary().to_string(index=False))
+
+    before = model.exact_inference()['mean']
+    learner.apply(model)
+    after = model.exact_inference()['mean']
+    print(f"\nMarginal P(success): {before*100:.1f}% → {after*100:.1f}% (learned CPT)")
+    print(f"Bayesian prior: {model.bayesian_prior*100:.1f}%")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Prediction Server for the Milei Reform Bayesian Predictor
+
+Keeps one warm `MileiReformPredictor` in memory and answers JSON requests
+over HTTP (TCP or a Unix socket), so polling clients do not pay for a new
+Python process, model construction and imports on every prediction.
+
+Cheap queries (posterior, batch posterior, scenarios, sensitivity, exact
+inference) are answered directly on the asyncio event loop. Monte Carlo
+runs are sent to a process pool so a long simulation never blocks them.
+
+Endpoints:
+    GET  /health
+    POST /posterior          {"legislative_majority": true, ...}
+    POST /posterior/batch    {"conditions": [[true, false, false, true, true], ...]}
+    GET  /scenarios
+    GET  /sensitivity
+    GET  /exact
+    POST /monte-carlo        {"n_simulations": 1000000, "seed": 42}
+                             or {"tolerance": 0.001} for an adaptive run
+                             (n_simulations then caps the draws; at most
+                             MAX_SIMULATIONS either way)
+
+Usage:
+    python prediction_server.py [--host 127.0.0.1] [--port 8765] [--unix PATH]
+
+Author: Adrian Lerer
+Date: 2025-10-17
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from milei_reform_bayesian_predictor import NODE_NAMES, MileiReformPredictor, MonteCarloSummary
+from result_cache import ResultCache
+
+MAX_BODY_BYTES = 64 * 1024 ** 2
+
+# Largest n_simulations a /monte-carlo request may ask for (~1 min per worker)
+MAX_SIMULATIONS = 100_000_000
+
+# Warm model of each Monte Carlo worker process
+_worker_model: Optional[MileiReformPredictor] = None
+
+
+def _init_worker(seed: int, cache_dir: Optional[str]):
+    global _worker_model
+    cache = ResultCache(cache_dir) if cache_dir else None
+    _worker_model = MileiReformPredictor(seed=seed, cache=cache)
+
+
+def _run_monte_carlo(params: Dict) -> Dict:
+    """Run a Monte Carlo summary in a worker process (params checked by _check_monte_carlo_params)."""
+    seed = params['seed']
+    if params['tolerance'] is not None:
+        summary = _worker_model.monte_carlo_adaptive(
+            tolerance=params['tolerance'],
+            max_simulations=params['n_simulations'] or 10_000_000,
+            seed=seed
+        )
+    else:
+        summary = _worker_model.monte_carlo_streaming(
+            n_simulations=params['n_simulations'] or 1_000_000,
+            seed=seed
+        )
+    return summarize_monte_carlo(summary)
+
+
+def summarize_monte_carlo(summary: MonteCarloSummary) -> Dict:
+    """JSON-ready view of a MonteCarloSummary."""
+    result = {
+        'n_draws': summary.n_draws,
+        'success_rate': summary.success_rate,
+        'standard_error': summary.standard_error,
+        'mean_prob_success': summary.mean_prob_success,
+        'ci_lower': summary.ci_lower,
+        'ci_upper': summary.ci_upper,
+        'cells': _records(summary.cell_table())
+    }
+    if summary.trace is not None:
+        result['trace'] = _records(summary.trace)
+    return result
+
+
+def _records(frame: pd.DataFrame) -> List[Dict]:
+    """DataFrame rows as dicts, with NaN/inf (e.g. rates of empty cells) as None."""
+    return [{key: None if isinstance(value, float) and not math.isfinite(value) else value
+             for key, value in record.items()}
+            for record in frame.to_dict(orient='records')]
+
+
+def _to_json(value):
+    """json.dumps fallback for NumPy and pandas values."""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, pd.DataFrame):
+        return value.to_dict(orient='records')
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class HTTPError(Exception):
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _check_condition_values(conditions: Dict, where: str = 'conditions'):
+    """Reject unknown node names and non-boolean states with 400 Bad Request."""
+    if not isinstance(conditions, dict):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"Expected an object of node states in {where}")
+    unknown = sorted(set(conditions) - set(NODE_NAMES))
+    if unknown:
+        raise HTTPError(HTTPStatus.BAD_REQUEST,
+                        f"Unknown condition(s) {unknown} in {where}; expected names from {NODE_NAMES}")
+    for name, value in conditions.items():
+        if not isinstance(value, bool):
+            raise HTTPError(HTTPStatus.BAD_REQUEST,
+                            f"Condition '{name}' in {where} must be true or false, got {value!r}")
+
+
+def _check_condition_rows(rows: List):
+    """Validate /posterior/batch rows: objects of node states or boolean vectors."""
+    if len({type(row) for row in rows}) > 1:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Mix of objects and lists in 'conditions'")
+    for i, row in enumerate(rows):
+        where = f'conditions[{i}]'
+        if isinstance(row, dict):
+            _check_condition_values(row, where)
+            missing = [name for name in NODE_NAMES if name not in row]
+            if missing:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, f"Missing condition(s) {missing} in {where}")
+        elif isinstance(row, list):
+            if len(row) != len(NODE_NAMES):
+                raise HTTPError(HTTPStatus.BAD_REQUEST,
+                                f"{where} must have {len(NODE_NAMES)} states ({', '.join(NODE_NAMES)})")
+            if not all(isinstance(value, bool) for value in row):
+                raise HTTPError(HTTPStatus.BAD_REQUEST, f"{where} must contain only true or false")
+        else:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"{where} must be an object or a list of booleans")
+
+
+def _check_monte_carlo_params(body: Dict) -> Dict:
+    """Validate a /monte-carlo body; returns n_simulations, tolerance and seed."""
+    if not isinstance(body, dict):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Expected an object with n_simulations, tolerance and seed")
+    unknown = sorted(set(body) - {'n_simulations', 'tolerance', 'seed'})
+    if unknown:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"Unknown parameter(s) {unknown}")
+
+    n_simulations = body.get('n_simulations')
+    if n_simulations is not None:
+        if isinstance(n_simulations, bool) or not isinstance(n_simulations, int) \
+                or not 0 < n_simulations <= MAX_SIMULATIONS:
+            raise HTTPError(HTTPStatus.BAD_REQUEST,
+                            f"n_simulations must be an integer from 1 to {MAX_SIMULATIONS:,}, got {n_simulations!r}")
+
+    tolerance = body.get('tolerance')
+    if tolerance is not None:
+        if isinstance(tolerance, bool) or not isinstance(tolerance, (int, float)) \
+                or not 0 < tolerance < math.inf:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"tolerance must be a positive number, got {tolerance!r}")
+        tolerance = float(tolerance)
+
+    seed = body.get('seed')
+    if seed is not None and (isinstance(seed, bool) or not isinstance(seed, int) or seed < 0):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"seed must be a non-negative integer or null, got {seed!r}")
+
+    return {'n_simulations': n_simulations, 'tolerance': tolerance, 'seed': seed}
+
+
+class PredictionServer:
+    """Asyncio JSON-over-HTTP server around one warm predictor."""
+
+    def __init__(self, model: Optional[MileiReformPredictor] = None,
+                 workers: int = 2, cache_dir: Optional[str] = None):
+        self.model = model or MileiReformPredictor(cache=ResultCache(cache_dir) if cache_dir else None)
+        self.executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                            initargs=(self.model.seed, cache_dir))
+        self.routes = {
+            ('GET', '/health'): self.health,
+            ('POST', '/posterior'): self.posterior,
+            ('POST', '/posterior/batch'): self.posterior_batch,
+            ('GET', '/scenarios'): self.scenarios,
+            ('GET', '/sensitivity'): self.sensitivity,
+            ('GET', '/exact'): self.exact,
+            ('POST', '/monte-carlo'): self.monte_carlo,
+        }
+
+    # --- Endpoints ---------------------------------------------------------
+
+    async def health(self, body: Dict) -> Dict:
+        return {'status': 'ok', 'model': self.model.parameter_fingerprint()}
+
+    async def posterior(self, body: Dict) -> Dict:
+        _check_condition_values(body, 'request body')
+        return self.model.calculate_posterior(**body)
+
+    async def posterior_batch(self, body: Dict) -> Dict:
+        conditions = body.get('conditions') if isinstance(body, dict) else None
+        if not conditions or not isinstance(conditions, list):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Expected a non-empty 'conditions' list")
+        _check_condition_rows(conditions)
+        if isinstance(conditions[0], dict):
+            conditions = pd.DataFrame(conditions)
+        try:
+            return self.model.calculate_posterior_batch(conditions)
+        except ValueError as e:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, str(e))
+
+    async def scenarios(self, body: Dict) -> Dict:
+        return {'scenarios': self.model.analyze_scenarios()}
+
+    async def sensitivity(self, body: Dict) -> Dict:
+        return {'sensitivity': self.model.sensitivity_analysis()}
+
+    async def exact(self, body: Dict) -> Dict:
+        return self.model.exact_inference()
+
+    async def monte_carlo(self, body: Dict) -> Dict:
+        params = _check_monte_carlo_params(body)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, _run_monte_carlo, params)
+
+    # --- HTTP handling -----------------------------------------------------
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict, Dict]]:
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        try:
+            method, target, _ = request_line.decode('latin-1').split(' ', 2)
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, 'Malformed request line')
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        length = int(headers.get('content-length', 0))
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, 'Request body too large')
+        body = {}
+        if length:
+            try:
+                body = json.loads(await reader.readexactly(length))
+            except json.JSONDecodeError as e:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, f'Invalid JSON: {e}')
+
+        return method.upper(), target.split('?', 1)[0], headers, body
+
+    async def _write_response(self, writer: asyncio.StreamWriter, status: HTTPStatus,
+                              payload: Dict, keep_alive: bool):
+        data = json.dumps(payload, default=_to_json, allow_nan=False).encode('utf-8')
+        head = (f'HTTP/1.1 {status.value} {status.phrase}\r\n'
+                f'Content-Type: application/json\r\n'
+                f'Content-Length: {len(data)}\r\n'
+                f'Connection: {"keep-alive" if keep_alive else "close"}\r\n\r\n')
+        writer.write(head.encode('latin-1') + data)
+        await writer.drain()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve requests on one connection until the client closes it."""
+        try:
+            while True:
+                keep_alive = False
+                try:
+                    request = await self._read_request(reader)
+                    if request is None:
+                        break
+                    method, path, headers, body = request
+                    keep_alive = headers.get('connection', '').lower() != 'close'
+
+                    endpoint = self.routes.get((method, path))
+                    if endpoint is None:
+                        raise HTTPError(HTTPStatus.NOT_FOUND, f'No endpoint {method} {path}')
+                    status, payload = HTTPStatus.OK, await endpoint(body)
+                except HTTPError as e:
+                    status, payload = e.status, {'error': str(e)}
+                except Exception as e:
+                    status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {'error': repr(e)}
+
+                await self._write_response(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = '127.0.0.1', port: int = 8765,
+                    unix_path: Optional[str] = None):
+        if unix_path:
+            server = await asyncio.start_unix_server(self.handle, path=unix_path)
+            print(f"Serving predictions on unix:{unix_path}")
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+            print(f"Serving predictions on http://{host}:{port}")
+
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.executor.shutdown(cancel_futures=True)
+            if unix_path and os.path.exists(unix_path):
+                os.remove(unix_path)
+
+
+def main():
+    """Start the prediction server"""
+    parser = argparse.ArgumentParser(description='Milei reform prediction server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help='Serve on a Unix socket at this path instead of TCP')
+    parser.add_argument('--workers', type=int, default=2,
+                        help='Processes for Monte Carlo requests')
+    parser.add_argument('--cache-dir', help='On-disk result cache directory')
+    args = parser.parse_args()
+
+    server = PredictionServer(workers=args.workers, cache_dir=args.cache_dir)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Typed, Indexed Access to the Historical Reforms Database
+
+Parses `data/historical_reforms_database.csv` once into typed columns so
+consumers stop re-parsing its free-text fields:
+
+    outcome              categorical: Failed / Partial / Success / Predicted
+    duration, event      time to reversal, censored for "Active (N months)"
+    censored             still in force at `duration` months
+    challenge_filed      boolean (constitutional_challenge_filed == 'Yes')
+    challenge_status     categorical: Yes / No / Pending / Predicted / Unknown
+    lock_in_dimensions   tuple of lock-in tokens, plus one boolean
+                         lock_in_<dimension> column per token
+    instrument_type      Decree / Bill / National law / ... (see survival)
+    anti_reform          row is a pro-labor re-regulation, not a reform
+
+The original columns are kept unchanged. Row positions are indexed by
+government, year, instrument type and outcome, so selections are dict
+lookups. The parsed DataFrame is pickled in a ResultCache keyed by the
+CSV's content hash and the parser source, so reloads skip parsing until
+either changes. `load_reforms(db_path=...)` reads the same frame from a
+reforms_store SQLite database instead of the CSV.
+
+Author: Adrian Lerer
+Date: 2025-10-17
+"""
+
+import hashlib
+import os
+import time
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional
+
+import survival
+from result_cache import ResultCache
+from survival import DATA_PATH, classify_instruments, parse_durations
+
+DEFAULT_CACHE_DIR = os.path.join('.cache', 'reforms')
+
+# Bump when the parsed columns change, so stale cache entries are ignored.
+# Cache keys also include the source of the parsing modules (parser_digest).
+SCHEMA_VERSION = 2
+
+OUTCOMES = ['Failed', 'Partial', 'Success', 'Predicted']
+CHALLENGE_STATUSES = ['Yes', 'No', 'Pending', 'Predicted', 'Unknown']
+
+# Lock-in tokens; 'All dimensions' expands to every token
+LOCK_IN_DIMENSIONS = ['Constitutional', 'Judicial', 'Political', 'Institutional',
+                      'Federal', 'Temporal']
+
+INDEX_COLUMNS = ('government', 'year', 'instrument_type', 'outcome')
+
+# Columns parse_reforms appends to the CSV columns, in order
+TYPED_COLUMNS = ['outcome', 'duration', 'event', 'censored', 'challenge_status', 'challenge_filed',
+                 'lock_in_dimensions', *[f'lock_in_{dimension.lower()}' for dimension in LOCK_IN_DIMENSIONS],
+                 'instrument_type', 'anti_reform']
+
+
+def _lock_in_tokens(value) -> tuple:
+    if pd.isna(value):
+        return ()
+    if str(value).strip().lower() == 'all dimensions':
+        return tuple(LOCK_IN_DIMENSIONS)
+    # "Institutional Path Dependency" -> Institutional
+    parts = [part.strip().split()[0].capitalize() for part in str(value).split('+') if part.strip()]
+    return tuple(dimension for dimension in LOCK_IN_DIMENSIONS if dimension in parts)
+
+
+def parse_reforms(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add the typed columns to a raw reforms DataFrame.
+
+    Args:
+        df: Reforms database as read by pd.read_csv
+
+    Returns:
+        Copy of `df` with the typed columns described in the module docstring
+    """
+    df = df.copy()
+    outcome = df['final_outcome'].fillna('').str.strip().str.lower()
+    df['outcome'] = pd.Categorical(
+        np.select([outcome.str.startswith('prediction'), outcome.str.startswith('success'),
+                   outcome.str.startswith('partial')],
+                  ['Predicted', 'Success', 'Partial'], default='Failed'),
+        categories=OUTCOMES)
+
+    durations = parse_durations(df['time_to_reversal_months'])
+    df['duration'] = durations['duration']
+    df['event'] = durations['event']
+    df['censored'] = durations['duration'].notna() & ~durations['event']
+
+    challenge = df['constitutional_challenge_filed'].fillna('Unknown').str.strip()
+    df['challenge_status'] = pd.Categorical(
+        np.where(challenge.str.lower().str.startswith('predicted'), 'Predicted', challenge),
+        categories=CHALLENGE_STATUSES)
+    df['challenge_filed'] = df['challenge_status'].eq('Yes')
+
+    df['lock_in_dimensions'] = df['lock_in_dimension'].map(_lock_in_tokens)
+    for dimension in LOCK_IN_DIMENSIONS:
+        df[f'lock_in_{dimension.lower()}'] = df['lock_in_dimensions'].map(lambda tokens: dimension in tokens)
+
+    df['instrument_type'] = pd.Categorical(classify_instruments(df['legal_instrument']))
+    df['anti_reform'] = df['reversal_mechanism'].fillna('').str.lower().str.contains('anti-reform')
+    return df
+
+
+class ReformsDatabase:
+    """
+    Parsed reforms with row-position indexes on the main lookup columns.
+
+    Example:
+        db = load_reforms()
+        db.select(government='Macri', outcome='Failed')
+    """
+
+    def __init__(self, frame: pd.DataFrame, source_digest: Optional[str] = None):
+        self.frame = frame
+        self.source_digest = source_digest
+        self.indexes: Dict[str, Dict] = {
+            column: {key: positions for key, positions in frame.groupby(column, observed=True).indices.items()}
+            for column in INDEX_COLUMNS
+        }
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def positions(self, **criteria) -> np.ndarray:
+        """
+        Row positions matching every criterion.
+
+        Each keyword is an indexed column; its value is one key or a list
+        of keys (matched as alternatives).
+        """
+        result = None
+        for column, value in criteria.items():
+            if column not in self.indexes:
+                raise KeyError(f"'{column}' is not indexed; use one of {list(INDEX_COLUMNS)}")
+            keys = value if isinstance(value, (list, tuple, set, frozenset)) else [value]
+            index = self.indexes[column]
+            matches = np.unique(np.concatenate([index.get(key, np.empty(0, dtype=np.intp)) for key in keys]))
+            result = matches if result is None else np.intersect1d(result, matches, assume_unique=True)
+        return np.arange(len(self.frame)) if result is None else result
+
+    def select(self, **criteria) -> pd.DataFrame:
+        """Rows matching every criterion (see `positions`)."""
+        return self.frame.iloc[self.positions(**criteria)]
+
+    def counts(self, column: str) -> pd.Series:
+        """Number of reforms per key of an indexed column."""
+        return pd.Series({key: len(positions) for key, positions in self.indexes[column].items()}, name=column)
+
+
+def file_digest(path: str) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def parser_digest() -> str:
+    """Hash of the modules that parse the CSV (this one and survival.py)."""
+    digests = [file_digest(path) for path in (os.path.abspath(__file__), survival.__file__)]
+    return hashlib.sha256(''.join(digests).encode()).hexdigest()
+
+
+def load_reforms(path: str = DATA_PATH, cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+                 db_path: Optional[str] = None) -> ReformsDatabase:
+    """
+    Parsed and indexed reforms database.
+
+    Args:
+        path: Reforms database CSV
+        cache_dir: ResultCache directory for the parsed database, or None
+            to always parse
+        db_path: SQLite store (reforms_store.ReformsStore) to read instead
+            of the CSV; `path` and `cache_dir` are then ignored
+
+    Returns:
+        ReformsDatabase whose `frame` has the original plus typed columns
+    """
+    if db_path is not None:
+        # reforms_store imports this module
+        from reforms_store import ReformsStore
+        if not os.path.exists(db_path):
+            raise FileNotFoundError(f"No reforms store at {db_path}; create it with reforms_store.py --db")
+        with ReformsStore(db_path) as store:
+            return store.to_database(order_by='rowid')
+
+    digest = file_digest(path)
+
+    def parse():
+        return parse_reforms(pd.read_csv(path))
+
+    if cache_dir is None:
+        return ReformsDatabase(parse(), digest)
+    # Only the DataFrame is cached; indexes are cheap to rebuild and caching
+    # the class would tie entries to the module it was pickled from
+    frame = ResultCache(cache_dir).get_or_compute(
+        'reforms_frame', {'digest': digest, 'schema': SCHEMA_VERSION, 'parser': parser_digest()}, parse)
+    return ReformsDatabase(frame, digest)
+
+
+def main():
+    """Parse the reforms database and time cold vs. cached loads"""
+    start = time.perf_counter()
+    db = load_reforms(cache_dir=None)
+    parsed = time.perf_counter() - start
+
+    load_reforms()  # Warm the cache
+    start = time.perf_counter()
+    db = load_reforms()
+    cached = time.perf_counter() - start
+
+    print(f"{len(db)} reforms: parsed in {parsed * 1000:.1f} ms, cached reload in {cached * 1000:.1f} ms")
+    for column in INDEX_COLUMNS:
+        print(f"\nBy {column}:")
+        print(db.counts(column).to_string())
+
+    columns = ['reform_id', 'year', 'government', 'outcome', 'duration', 'censored',
+               'challenge_filed', 'lock_in_dimensions']
+    print("\nMacri and Milei reforms:")
+    print(db.select(government=['Macri', 'Milei'])[columns].to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+SQLite Store for Large Reform Event Databases
+
+Optional backend for reform databases that outgrow a single CSV (sectoral,
+provincial and CCT-level events across countries). The `reforms` table has
+one TEXT/INTEGER/REAL column per CSV column, in CSV order, plus the typed
+columns of reforms_data.parse_reforms (outcome, duration, event, censored,
+challenge_filed, instrument_type, anti_reform, lock_in_<dimension>), and
+is indexed on year, government, scope, outcome and instrument type.
+
+CSV files are imported in chunks inside one transaction; rows are keyed by
+reform_id, so re-importing a file updates existing rows in place (keeping
+their position in the import order). Columns that a
+new CSV adds are appended to the table. Queries filter and aggregate in
+SQL, so consumers only load the rows they need:
+
+    store = ReformsStore('reforms.sqlite')
+    store.import_csv('data/historical_reforms_database.csv')
+    store.select(government=['Macri', 'Milei'], since=2016)
+    store.counts('government', outcome='Failed')
+
+Author: Adrian Lerer
+Date: 2025-10-17
+"""
+
+import argparse
+import os
+import sqlite3
+import time
+
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from reforms_data import (
+    DATA_PATH, LOCK_IN_DIMENSIONS, OUTCOMES, CHALLENGE_STATUSES, TYPED_COLUMNS, ReformsDatabase, parse_reforms
+)
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                               '..', 'data', 'historical_reforms.sqlite')
+
+TABLE = 'reforms'
+KEY_COLUMN = 'reform_id'
+
+# Typed columns stored next to the CSV columns (SQLite affinity)
+DERIVED_COLUMNS = {
+    'outcome': 'TEXT',
+    'duration': 'REAL',
+    'event': 'INTEGER',
+    'censored': 'INTEGER',
+    'challenge_status': 'TEXT',
+    'challenge_filed': 'INTEGER',
+    'instrument_type': 'TEXT',
+    'anti_reform': 'INTEGER',
+    **{f'lock_in_{dimension.lower()}': 'INTEGER' for dimension in LOCK_IN_DIMENSIONS}
+}
+BOOLEAN_COLUMNS = [name for name, affinity in DERIVED_COLUMNS.items()
+                   if affinity == 'INTEGER']
+
+INDEXED_COLUMNS = ('year', 'government', 'scope', 'outcome', 'instrument_type')
+
+# Keyword filters of select/counts that compare a column against bounds
+RANGE_FILTERS = {'since': ('year', '>='), 'until': ('year', '<=')}
+
+
+def sql_affinity(dtype) -> str:
+    """SQLite column affinity for a pandas dtype."""
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype):
+        return 'INTEGER'
+    if pd.api.types.is_float_dtype(dtype):
+        return 'REAL'
+    return 'TEXT'
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+class ReformsStore:
+    """
+    SQLite-backed reforms table with CSV import/export and filtered queries.
+
+    Filters are keyword arguments naming a column; a list value matches
+    any of its elements, `since`/`until` bound the year.
+    """
+
+    def __init__(self, path: str = DEFAULT_DB_PATH):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('PRAGMA journal_mode=WAL' if path != ':memory:' else 'PRAGMA journal_mode=MEMORY')
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # Schema
+
+    def columns(self) -> List[str]:
+        """Table columns in definition order (empty if the table does not exist)."""
+        return [row[1] for row in self.connection.execute(f'PRAGMA table_info({TABLE})')]
+
+    def source_columns(self) -> List[str]:
+        """CSV columns, in the order of the first imported file."""
+        derived = set(DERIVED_COLUMNS)
+        return [column for column in self.columns() if column not in derived]
+
+    def _ensure_schema(self, frame: pd.DataFrame, source_columns: Sequence[str]):
+        existing = self.columns()
+        if not existing:
+            definitions = [f'{_quote(column)} {sql_affinity(frame[column].dtype)}'
+                           + (' PRIMARY KEY' if column == KEY_COLUMN else '')
+                           for column in source_columns]
+            definitions += [f'{_quote(column)} {affinity}' for column, affinity in DERIVED_COLUMNS.items()]
+            self.connection.execute(f'CREATE TABLE {TABLE} ({", ".join(definitions)})')
+            for column in INDEXED_COLUMNS:
+                if column in source_columns or column in DERIVED_COLUMNS:
+                    self.connection.execute(
+                        f'CREATE INDEX IF NOT EXISTS idx_{TABLE}_{column} ON {TABLE} ({_quote(column)})')
+            return
+
+        for column in source_columns:
+            if column not in existing:
+                self.connection.execute(
+                    f'ALTER TABLE {TABLE} ADD COLUMN {_quote(column)} {sql_affinity(frame[column].dtype)}')
+
+    # Import / export
+
+    def import_frame(self, df: pd.DataFrame) -> int:
+        """
+        Insert or update raw reform rows (CSV columns) and their typed columns.
+
+        Returns:
+            Number of rows written
+        """
+        if KEY_COLUMN not in df.columns:
+            raise ValueError(f"Reform rows need a '{KEY_COLUMN}' column")
+        source_columns = list(df.columns)
+        parsed = parse_reforms(df)
+        self._ensure_schema(parsed, source_columns)
+
+        columns = source_columns + list(DERIVED_COLUMNS)
+        values = parsed[columns].astype(object)
+        for column in BOOLEAN_COLUMNS:
+            values[column] = parsed[column].astype(int)
+        values = values.where(parsed[columns].notna(), None)
+
+        placeholders = ', '.join('?' * len(columns))
+        # Upsert rather than INSERT OR REPLACE, which would delete the row
+        # and give it a new rowid (the import order load_reforms reads)
+        updates = ', '.join(f'{_quote(column)} = excluded.{_quote(column)}'
+                            for column in columns if column != KEY_COLUMN)
+        self.connection.executemany(
+            f'INSERT INTO {TABLE} ({", ".join(map(_quote, columns))}) VALUES ({placeholders}) '
+            f'ON CONFLICT({_quote(KEY_COLUMN)}) DO UPDATE SET {updates}',
+            values.itertuples(index=False, name=None))
+        return len(values)
+
+    def import_csv(self, path: str = DATA_PATH, chunksize: int = 50_000, replace: bool = False) -> int:
+        """
+        Bulk-load a reforms CSV in chunks inside one transaction.
+
+        Args:
+            path: CSV with at least a reform_id column
+            chunksize: Rows parsed and inserted per batch
+            replace: Drop the existing table first
+
+        Returns:
+            Number of rows written
+        """
+        written = 0
+        with self.connection:
+            if replace:
+                self.connection.execute(f'DROP TABLE IF EXISTS {TABLE}')
+            for chunk in pd.read_csv(path, chunksize=chunksize):
+                written += self.import_frame(chunk)
+        return written
+
+    def export_csv(self, path: str, **criteria) -> int:
+        """
+        Write the CSV columns of the (filtered) rows, in CSV column order.
+
+        Returns:
+            Number of rows written
+        """
+        frame = self.select(columns=self.source_columns(), **criteria)
+        frame.to_csv(path, index=False)
+        return len(frame)
+
+    # Queries
+
+    def _where(self, criteria: Dict) -> tuple:
+        columns = set(self.columns())
+        clauses, params = [], []
+        for name, value in criteria.items():
+            if name in RANGE_FILTERS:
+                column, operator = RANGE_FILTERS[name]
+                clauses.append(f'{_quote(column)} {operator} ?')
+                params.append(value)
+                continue
+            if name not in columns:
+                raise KeyError(f"Unknown column '{name}'")
+            values = list(value) if isinstance(value, (list, tuple, set, frozenset)) else [value]
+            values = [int(v) if isinstance(v, (bool, np.bool_)) else v for v in values]
+            clauses.append(f'{_quote(name)} IN ({", ".join("?" * len(values))})')
+            params.extend(values)
+        return (' WHERE ' + ' AND '.join(clauses) if clauses else ''), params
+
+    def select(self, columns: Optional[Iterable[str]] = None, order_by: str = 'year',
+               **criteria) -> pd.DataFrame:
+        """
+        Rows matching every criterion.
+
+        Args:
+            columns: Columns to return (default: all)
+            order_by: Sort column
+            **criteria: column=value(s) filters, since/until year bounds
+
+        Returns:
+            DataFrame with booleans and categories restored for typed columns
+        """
+        selected = ', '.join(map(_quote, columns)) if columns is not None else '*'
+        where, params = self._where(criteria)
+        frame = pd.read_sql_query(f'SELECT {selected} FROM {TABLE}{where} ORDER BY {_quote(order_by)}, rowid',
+                                  self.connection, params=params)
+        for column in BOOLEAN_COLUMNS:
+            if column in frame:
+                frame[column] = frame[column].astype(bool)
+        if 'outcome' in frame:
+            frame['outcome'] = pd.Categorical(frame['outcome'], categories=OUTCOMES)
+        if 'challenge_status' in frame:
+            frame['challenge_status'] = pd.Categorical(frame['challenge_status'], categories=CHALLENGE_STATUSES)
+        return frame
+
+    def counts(self, by: str, **criteria) -> pd.Series:
+        """Number of matching rows per value of `by`, computed in SQL."""
+        where, params = self._where(criteria)
+        rows = self.connection.execute(
+            f'SELECT {_quote(by)}, COUNT(*) FROM {TABLE}{where} GROUP BY {_quote(by)} ORDER BY {_quote(by)}',
+            params).fetchall()
+        return pd.Series(dict(rows), name=by, dtype=int)
+
+    def to_database(self, order_by: str = 'year', **criteria) -> ReformsDatabase:
+        """
+        Matching rows as an in-memory ReformsDatabase (same frame layout
+        as reforms_data.load_reforms), for code written against the CSV loader.
+        """
+        frame = self.select(order_by=order_by, **criteria)
+        frame['instrument_type'] = frame['instrument_type'].astype('category')
+        flags = frame[[f'lock_in_{dimension.lower()}' for dimension in LOCK_IN_DIMENSIONS]].to_numpy(dtype=bool)
+        frame['lock_in_dimensions'] = [tuple(dimension for dimension, flag in zip(LOCK_IN_DIMENSIONS, row) if flag)
+                                       for row in flags]
+        return ReformsDatabase(frame[self.source_columns() + TYPED_COLUMNS])
+
+
+def main():
+    """Import the reforms CSV into SQLite and run sample queries"""
+    parser = argparse.ArgumentParser(description='SQLite store for the reforms database')
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help='SQLite file')
+    parser.add_argument('--import-csv', default=DATA_PATH, help='CSV to import')
+    parser.add_argument('--export-csv', help='Write the stored rows back to this CSV')
+    parser.add_argument('--replace', action='store_true', help='Drop the table before importing')
+    args = parser.parse_args()
+
+    with ReformsStore(args.db) as store:
+        start = time.perf_counter()
+        written = store.import_csv(args.import_csv, replace=args.replace)
+        print(f"Imported {written} rows into {args.db} in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+        print("\nReforms by government:")
+        print(store.counts('government').to_string())
+        print("\nFailures by government since 2015:")
+        print(store.counts('government', outcome='Failed', since=2015).to_string())
+        print("\nConstitutional challenges filed:")
+        print(store.select(['reform_id', 'year', 'government', 'outcome', 'duration'],
+                           challenge_filed=True).to_string(index=False))
+
+        if args.export_csv:
+            print(f"\nExported {store.export_csv(args.export_csv)} rows to {args.export_csv}")
+
+
+if __name__ == '__main__':
+    main()
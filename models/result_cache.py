@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Content-Addressed Result Cache for Predictor Analyses
+
+Stores analysis artifacts (scenarios, sensitivity tables, Monte Carlo
+summaries, reports) on disk under a hash of everything that determines
+them: the model parameters plus the arguments of the analysis. Entries are
+evicted least-recently-used first once the cache exceeds its size cap.
+
+Author: Adrian Lerer
+Date: 2025-10-17
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+
+from typing import Any, Callable, Dict, Optional
+
+DEFAULT_CACHE_DIR = os.path.join('.cache', 'predictor')
+DEFAULT_MAX_BYTES = 256 * 1024 ** 2
+
+
+def content_key(name: str, params: Dict[str, Any]) -> str:
+    """
+    Hash an artifact name and its parameters into a cache key.
+
+    Parameters are serialized as canonical JSON (sorted keys, floats as
+    repr), so equal parameter sets always map to the same key.
+    """
+    payload = json.dumps({'artifact': name, 'params': params}, sort_keys=True, default=repr)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    """
+    On-disk pickle cache with LRU eviction and a total size cap.
+
+    Recency is tracked through file modification times, which are refreshed
+    on every hit, so the cache survives across processes.
+    """
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f'{key}.pkl')
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the cached value for a key, or `default` on a miss."""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            return default
+        except Exception:
+            # Truncated or stale entry (e.g. a class that moved or was pickled
+            # from __main__): drop it and recompute
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return default
+
+        try:
+            os.utime(path)  # Mark as most recently used
+        except FileNotFoundError:
+            pass  # Evicted by another process after loading
+        return value
+
+    def put(self, key: str, value: Any) -> bool:
+        """
+        Store a value atomically, then evict old entries over the size cap.
+
+        Returns:
+            False if the value alone exceeds the cap and was not stored
+        """
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(data) > self.max_bytes:
+            return False
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, self._path(key))
+        self.evict()
+        return True
+
+    def __contains__(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def get_or_compute(self, name: str, params: Dict[str, Any],
+                       compute: Callable[[], Any]) -> Any:
+        """Return the cached artifact for (name, params), computing it on a miss."""
+        key = content_key(name, params)
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def entries(self):
+        """(mtime, size, path) of every entry, least recently used first."""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.pkl'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return sorted(entries)
+
+    def size(self) -> int:
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self, max_bytes: Optional[int] = None):
+        """Delete least recently used entries until the cache fits the cap."""
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+
+        for _, size, path in entries:
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        self.evict(max_bytes=0)
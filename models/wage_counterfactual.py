@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+Counterfactual Wage/Productivity Simulation (Ultraactivity Sections 8.1-8.2)
+
+Compounds year-by-year growth vectors into index paths,
+
+    W_t = W_0 * prod_{s=1..t} (1 + g_s),
+
+for the actual CCT-driven wage, a productivity-linked counterfactual wage
+and productivity, and maps the log gap between the actual and
+counterfactual wage/productivity ratios into formal employment,
+informality and unemployment differences. Growth vectors may carry
+leading batch axes, so grids of thousands of counterfactual growth and
+elasticity assumptions are evaluated in one vectorized pass.
+
+Defaults are calibrated to `analysis/ultraactivity_ratchet_model.md`: the
+constant growth rates reproduce the Section 8.1 index endpoints (2025 vs.
+1991) and the elasticities reproduce its employment, informality and
+unemployment gaps. The "+6.4%" and "+1.8%" headline figures are averages
+per renewal event, not annual rates, so compounding them for 34 years does
+not give the table's indices.
+
+The Section 8.2 rollout is calibrated to its own table (calibrate_rollout),
+which is not consistent with Section 8.1: its long-run row implies a
+smaller employment and a larger informality response per log point of
+labor cost.
+
+Author: Adrian Lerer
+Date: 2025-10-17
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional, Sequence
+
+BASE_YEAR, END_YEAR = 1991, 2025
+N_YEARS = END_YEAR - BASE_YEAR
+
+# Section 8.1: 2025 indices (1991 = 100) and labor market outcomes
+SECTION_8_1_DOCUMENT = {
+    'actual_wage_index': 287.0,
+    'counterfactual_wage_index': 164.0,
+    'productivity_index': 157.0,
+    'formal_employment': {'actual': 8.2, 'counterfactual': 12.7},  # millions
+    'informality': {'actual': 48.0, 'counterfactual': 28.0},  # % of workers
+    'unemployment': {'actual': 7.1, 'counterfactual': 4.3}  # %
+}
+
+# Section 8.2: effects by year after limiting ultraactivity to 3 years
+SECTION_8_2_DOCUMENT = {
+    'zombie_eliminated': {1: 0.00, 2: 0.08, 3: 0.23, 5: 0.54, 10: 0.87},  # share of zombie CCTs
+    'labor_cost_reduction': {1: 0.0, 2: 0.012, 3: 0.037, 5: 0.089, 10: 0.142},
+    'formal_employment_gain': {1: 0, 2: 42, 3: 128, 5: 311, 10: 623},  # thousands
+    'informality_reduction': {1: 0.0, 2: 0.3, 3: 0.9, 5: 2.1, 10: 4.3},  # pp
+    # Steady state once every zombie CCT is gone
+    'long_run': {'labor_cost_reduction': 0.18, 'formal_employment_gain': 1100, 'informality_reduction': 7.8}
+}
+SECTION_8_2_ZOMBIE_PATH = SECTION_8_2_DOCUMENT['zombie_eliminated']
+LONG_RUN_COST_REDUCTION = SECTION_8_2_DOCUMENT['long_run']['labor_cost_reduction']
+
+
+def implied_growth_rate(end_index: float, n_years: int = N_YEARS, base: float = 100.0) -> float:
+    """Constant annual growth rate that takes `base` to `end_index`."""
+    return (end_index / base) ** (1 / n_years) - 1
+
+
+def compound(growth: np.ndarray, base: float = 100.0) -> np.ndarray:
+    """Index path base * cumprod(1 + g) along the last (year) axis."""
+    return base * np.cumprod(1 + np.asarray(growth, dtype=float), axis=-1)
+
+
+def calibrate_elasticities(document: Dict = SECTION_8_1_DOCUMENT) -> Dict[str, float]:
+    """
+    Outcome responses per log point of the wage/productivity gap.
+
+    Employment is a constant elasticity; informality and unemployment are
+    semi-elasticities in percentage points.
+    """
+    log_gap = np.log(document['actual_wage_index'] / document['counterfactual_wage_index'])
+    employment = document['formal_employment']
+    return {
+        'employment': np.log(employment['counterfactual'] / employment['actual']) / log_gap,
+        'informality': (document['informality']['actual'] -
+                        document['informality']['counterfactual']) / log_gap,
+        'unemployment': (document['unemployment']['actual'] -
+                         document['unemployment']['counterfactual']) / log_gap
+    }
+
+
+def calibrate_rollout(document: Dict = SECTION_8_2_DOCUMENT,
+                      formal_employment: float = SECTION_8_1_DOCUMENT['formal_employment']['actual']) -> Dict:
+    """
+    Section 8.2 rollout parameters.
+
+    Returns:
+        Dict with 'cost_pass_through' (share of the proportional long-run
+        cost reduction reached before the steady state, least squares over
+        the yearly rows), the long-run 'employment' elasticity and
+        'informality' semi-elasticity (from the long-run row) and
+        'response_share', the share of the long-run employment response
+        reached in each documented year
+    """
+    long_run = document['long_run']
+    years = np.array(list(document['zombie_eliminated']))
+    proportional = long_run['labor_cost_reduction'] * np.array(list(document['zombie_eliminated'].values()))
+    observed_cost = np.array([document['labor_cost_reduction'][year] for year in years])
+    pass_through = float(proportional @ observed_cost / (proportional @ proportional))
+
+    log_cost = -np.log1p(-long_run['labor_cost_reduction'])
+    employment = np.log1p(long_run['formal_employment_gain'] / 1000 / formal_employment) / log_cost
+    informality = long_run['informality_reduction'] / log_cost
+
+    # Years without any elimination carry no information on the response
+    active = proportional > 0
+    gains = np.array([document['formal_employment_gain'][year] for year in years[active]])
+    year_log_cost = -np.log1p(-pass_through * proportional[active])
+    shares = np.log1p(gains / 1000 / formal_employment) / (employment * year_log_cost)
+    return {
+        'cost_pass_through': pass_through,
+        'employment': float(employment),
+        'informality': float(informality),
+        'response_share': dict(zip(years[active].tolist(), shares.tolist()))
+    }
+
+
+class CounterfactualEngine:
+    """
+    Compounding-growth comparison of an actual and a counterfactual wage path.
+
+    Example:
+        engine = CounterfactualEngine()
+        engine.section_8_1_table()
+        engine.scenario_grid(np.linspace(0.005, 0.03, 60), np.linspace(0.3, 1.2, 50))
+    """
+
+    def __init__(self, actual_wage_growth: Optional[Sequence[float]] = None,
+                 productivity_growth: Optional[Sequence[float]] = None,
+                 counterfactual_wage_growth: Optional[Sequence[float]] = None,
+                 base: float = 100.0,
+                 observed: Optional[Dict[str, float]] = None,
+                 elasticities: Optional[Dict[str, float]] = None):
+        doc = SECTION_8_1_DOCUMENT
+
+        def path(growth, end_index):
+            if growth is None:
+                return np.full(N_YEARS, implied_growth_rate(end_index, N_YEARS, base))
+            return np.asarray(growth, dtype=float)
+
+        self.actual_wage_growth = path(actual_wage_growth, doc['actual_wage_index'])
+        self.productivity_growth = path(productivity_growth, doc['productivity_index'])
+        self.counterfactual_wage_growth = path(counterfactual_wage_growth,
+                                               doc['counterfactual_wage_index'])
+        if not (len(self.actual_wage_growth) == len(self.productivity_growth) ==
+                len(self.counterfactual_wage_growth)):
+            raise ValueError("Growth vectors must cover the same years")
+
+        self.base = base
+        self.observed = observed or {name: doc[name]['actual']
+                                     for name in ('formal_employment', 'informality', 'unemployment')}
+        self.elasticities = elasticities or calibrate_elasticities()
+
+    @property
+    def n_years(self) -> int:
+        return len(self.actual_wage_growth)
+
+    def paths(self) -> pd.DataFrame:
+        """Year-by-year index paths and wage/productivity ratios."""
+        actual = compound(self.actual_wage_growth, self.base)
+        counterfactual = compound(self.counterfactual_wage_growth, self.base)
+        productivity = compound(self.productivity_growth, self.base)
+        return pd.DataFrame({
+            'Year': BASE_YEAR + np.arange(1, self.n_years + 1),
+            'Actual Wage': actual,
+            'Counterfactual Wage': counterfactual,
+            'Productivity': productivity,
+            'Actual Ratio': actual / productivity,
+            'Counterfactual Ratio': counterfactual / productivity
+        })
+
+    def outcomes(self, counterfactual_growth=None, employment_elasticity=None,
+                 informality_semi=None, unemployment_semi=None,
+                 actual_growth=None, productivity_growth=None) -> Dict[str, np.ndarray]:
+        """
+        End-of-period outcomes for broadcastable batches of assumptions.
+
+        Growth arguments are paths of shape (..., n_years) or scalars
+        (constant growth); elasticities broadcast against the leading axes.
+        Omitted arguments use the engine's own paths and elasticities.
+
+        Returns:
+            Dict of arrays: indices, ratios and counterfactual outcomes
+        """
+        def growth_path(growth, default):
+            if growth is None:
+                return default
+            growth = np.asarray(growth, dtype=float)
+            if growth.ndim == 0:
+                return np.full(self.n_years, growth)
+            if growth.shape[-1] != self.n_years:
+                raise ValueError(f"Growth paths must have {self.n_years} years on the last axis")
+            return growth
+
+        def response(value, name):
+            return np.asarray(self.elasticities[name] if value is None else value, dtype=float)
+
+        actual = compound(growth_path(actual_growth, self.actual_wage_growth), self.base)[..., -1]
+        counterfactual = compound(growth_path(counterfactual_growth,
+                                              self.counterfactual_wage_growth), self.base)[..., -1]
+        productivity = compound(growth_path(productivity_growth, self.productivity_growth),
+                                self.base)[..., -1]
+
+        log_gap = np.log(actual / counterfactual)
+        employment = self.observed['formal_employment']
+        return {
+            'actual_wage_index': actual,
+            'counterfactual_wage_index': counterfactual,
+            'productivity_index': productivity,
+            'actual_ratio': actual / productivity,
+            'counterfactual_ratio': counterfactual / productivity,
+            'wage_gap': actual / counterfactual - 1,
+            'counterfactual_employment': employment * np.exp(response(employment_elasticity, 'employment') * log_gap),
+            'counterfactual_informality': self.observed['informality'] - response(informality_semi, 'informality') * log_gap,
+            'counterfactual_unemployment': self.observed['unemployment'] - response(unemployment_semi, 'unemployment') * log_gap
+        }
+
+    def section_8_1_table(self) -> pd.DataFrame:
+        """Section 8.1 results table (Scenario A actual vs. B counterfactual)."""
+        out = self.outcomes()
+        rows = [
+            ('Real wage index', out['actual_wage_index'], out['counterfactual_wage_index']),
+            ('Real productivity index', out['productivity_index'], out['productivity_index']),
+            ('Wage/Productivity ratio', out['actual_ratio'], out['counterfactual_ratio']),
+            ('Formal employment (millions)', self.observed['formal_employment'],
+             out['counterfactual_employment']),
+            ('Informality rate (%)', self.observed['informality'], out['counterfactual_informality']),
+            ('Unemployment rate (%)', self.observed['unemployment'], out['counterfactual_unemployment'])
+        ]
+        table = pd.DataFrame([(metric, float(a), float(b)) for metric, a, b in rows],
+                             columns=['Metric', 'Scenario A (Actual)', 'Scenario B (Counterfactual)'])
+        table['Difference'] = table['Scenario A (Actual)'] - table['Scenario B (Counterfactual)']
+        return table
+
+    def scenario_grid(self, counterfactual_growth_rates: Sequence[float],
+                      employment_elasticities: Sequence[float]) -> pd.DataFrame:
+        """
+        Evaluate every (counterfactual growth, employment elasticity) pair.
+
+        Returns:
+            One row per pair with the wage gap and labor market differences
+        """
+        growth, elasticity = np.meshgrid(np.asarray(counterfactual_growth_rates, dtype=float),
+                                         np.asarray(employment_elasticities, dtype=float),
+                                         indexing='ij')
+        # Constant counterfactual growth per grid point, broadcast over the years
+        paths = np.broadcast_to(growth[..., None], growth.shape + (self.n_years,))
+        out = self.outcomes(counterfactual_growth=paths, employment_elasticity=elasticity)
+        return pd.DataFrame({
+            'Counterfactual Growth': growth.ravel(),
+            'Employment Elasticity': elasticity.ravel(),
+            'Wage Gap': np.broadcast_to(out['wage_gap'], growth.shape).ravel(),
+            'Jobs Lost (millions)': (out['counterfactual_employment'] -
+                                     self.observed['formal_employment']).ravel(),
+            'Informality Gap (pp)': np.broadcast_to(self.observed['informality'] -
+                                                    out['counterfactual_informality'], growth.shape).ravel(),
+            'Unemployment Gap (pp)': np.broadcast_to(self.observed['unemployment'] -
+                                                     out['counterfactual_unemployment'], growth.shape).ravel()
+        })
+
+    def uncertainty_bands(self, n_draws: int = 10_000, growth_noise: float = 0.02,
+                          elasticity_cv: float = 0.25, quantiles=(0.05, 0.5, 0.95),
+                          seed: int = 42) -> pd.DataFrame:
+        """
+        Quantiles of the Section 8.1 differences under resampled inputs.
+
+        Each draw bootstraps the years of the growth vectors (jointly, so
+        the paths stay aligned), adds independent yearly noise with standard
+        deviation `growth_noise` to each path, and scales every elasticity
+        by a mean-one lognormal factor with coefficient of variation
+        `elasticity_cv`.
+        """
+        rng = np.random.default_rng(seed)
+        years = rng.integers(0, self.n_years, size=(n_draws, self.n_years))
+
+        def resample(growth):
+            return growth[years] + rng.normal(0.0, growth_noise, size=years.shape)
+
+        sigma = np.sqrt(np.log1p(elasticity_cv ** 2))
+
+        def scale():
+            return rng.lognormal(-sigma ** 2 / 2, sigma, size=n_draws)
+
+        out = self.outcomes(
+            counterfactual_growth=resample(self.counterfactual_wage_growth),
+            actual_growth=resample(self.actual_wage_growth),
+            productivity_growth=resample(self.productivity_growth),
+            employment_elasticity=self.elasticities['employment'] * scale(),
+            informality_semi=self.elasticities['informality'] * scale(),
+            unemployment_semi=self.elasticities['unemployment'] * scale()
+        )
+
+        metrics = {
+            'Wage gap (A vs. B, %)': 100 * out['wage_gap'],
+            'Wage/Productivity ratio (A)': out['actual_ratio'],
+            'Formal jobs lost (millions)': out['counterfactual_employment'] - self.observed['formal_employment'],
+            'Informality gap (pp)': self.observed['informality'] - out['counterfactual_informality'],
+            'Unemployment gap (pp)': self.observed['unemployment'] - out['counterfactual_unemployment']
+        }
+        return pd.DataFrame([
+            {'Metric': name, **{f'q{q*100:g}': value for q, value in zip(quantiles, np.quantile(draws, quantiles))}}
+            for name, draws in metrics.items()
+        ])
+
+    def reform_rollout_table(self, zombie_eliminated: Dict[int, float] = SECTION_8_2_ZOMBIE_PATH,
+                             long_run_cost_reduction: float = LONG_RUN_COST_REDUCTION,
+                             document: Dict = SECTION_8_2_DOCUMENT) -> pd.DataFrame:
+        """
+        Section 8.2 table: effects by year after limiting ultraactivity.
+
+        Labor costs fall in proportion to the share of zombie CCTs
+        eliminated, scaled by the short-run cost pass-through; employment
+        and informality respond to the log cost reduction with the yearly
+        response share of the long-run elasticities (interpolated between
+        documented years). The last row is the long-run steady state (all
+        zombie CCTs gone, full pass-through and response).
+
+        With the defaults the employment column and the long-run row match
+        the document. Labor costs are within 0.11 pp (one pass-through for
+        all years) and short-run informality is up to 0.24 pp larger, as the
+        document's informality/employment ratio is not constant.
+        """
+        rollout = calibrate_rollout(document, self.observed['formal_employment'])
+        years = np.array(list(zombie_eliminated) + [np.nan])
+        eliminated = np.array(list(zombie_eliminated.values()) + [1.0])
+        long_run = np.isnan(years)
+        calibrated = rollout['response_share']
+        response = np.where(long_run, 1.0, np.interp(years, list(calibrated), list(calibrated.values())))
+        pass_through = np.where(long_run, 1.0, rollout['cost_pass_through'])
+
+        cost_reduction = pass_through * long_run_cost_reduction * eliminated
+        log_cost = -np.log1p(-cost_reduction)
+        employment = self.observed['formal_employment']
+
+        table = pd.DataFrame({
+            'Year Post-Reform': [f'Year {int(y)}' if not np.isnan(y) else 'Long run' for y in years],
+            'Zombie CCT Eliminated (%)': 100 * eliminated,
+            'Labor Cost Reduction (%)': -100 * cost_reduction,
+            'Formal Employment Gain (thousands)': 1000 * employment *
+                np.expm1(response * rollout['employment'] * log_cost),
+            'Informality Reduction (pp)': -response * rollout['informality'] * log_cost
+        })
+        # Nothing is eliminated in year 1; show 0.0 rather than -0.0
+        return table.replace(-0.0, 0.0)
+
+
+def main():
+    """Print the Section 8.1 and 8.2 tables with uncertainty bands"""
+    engine = CounterfactualEngine()
+    pd.set_option('display.width', 120)
+
+    print("Section 8.1: Counterfactual without ultraactivity (2025 vs. 1991)")
+    print(engine.section_8_1_table().round(2).to_string(index=False))
+
+    print("\nUncertainty bands (10,000 resampled inputs):")
+    print(engine.uncertainty_bands().round(2).to_string(index=False))
+
+    grid = engine.scenario_grid(np.linspace(0.005, 0.035, 100), np.linspace(0.3, 1.2, 100))
+    print(f"\nScenario grid: {len(grid):,} assumptions; jobs lost ranges "
+          f"{grid['Jobs Lost (millions)'].min():.1f}-{grid['Jobs Lost (millions)'].max():.1f} million")
+
+    print("\nSection 8.2: Limiting ultraactivity to 3 years")
+    print(engine.reform_rollout_table().round(1).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Import-time benchmark for the Bayesian predictor
+
+Measures how long a fresh interpreter takes to import
+models/milei_reform_bayesian_predictor.py and checks it against a target,
+so that heavy dependencies (matplotlib, seaborn, scipy) stay out of the
+import path of batch jobs that only need probabilities.
+
+Usage:
+    python benchmark_import_time.py [--target 1.0] [--repeat 5]
+
+Exits with status 1 if the median import time exceeds the target or if a
+plotting/scipy module is imported eagerly.
+
+Author: Ignacio Adrián Lerer
+Date: October 2025
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+MODELS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'models')
+
+# Modules that must only be imported when actually used
+LAZY_MODULES = ('matplotlib', 'seaborn', 'scipy')
+
+PROBE = """
+import json, sys, time
+sys.path.insert(0, {models_dir!r})
+start = time.perf_counter()
+import milei_reform_bayesian_predictor
+elapsed = time.perf_counter() - start
+eager = sorted({{name.split('.')[0] for name in sys.modules}} & set({lazy!r}))
+print(json.dumps({{'seconds': elapsed, 'eager': eager}}))
+"""
+
+
+def measure_import(repeat: int = 5):
+    """Import the predictor in `repeat` fresh interpreters."""
+    code = PROBE.format(models_dir=MODELS_DIR, lazy=LAZY_MODULES)
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', code], check=True,
+                                capture_output=True, text=True).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    return runs
+
+
+def main():
+    """Run the benchmark and check the target"""
+    parser = argparse.ArgumentParser(description='Predictor import-time benchmark')
+    parser.add_argument('--target', type=float, default=1.0,
+                        help='Maximum median import time in seconds')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Number of fresh interpreters to time')
+    args = parser.parse_args()
+
+    runs = measure_import(args.repeat)
+    times = [run['seconds'] for run in runs]
+    eager = sorted({name for run in runs for name in run['eager']})
+    median = statistics.median(times)
+
+    print(f"Import time: median {median*1000:.0f} ms, "
+          f"min {min(times)*1000:.0f} ms, max {max(times)*1000:.0f} ms "
+          f"(target {args.target*1000:.0f} ms)")
+
+    ok = median <= args.target
+    if eager:
+        print(f"✗ Eagerly imported: {', '.join(eager)}")
+        ok = False
+
+    print("✓ Import time within target" if ok else "✗ Import benchmark failed")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
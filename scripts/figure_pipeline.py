@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Parallel Figure Build for the Labor Regime Paper
+
+Registers every figure function of generate_labor_figures.py (v4) and
+generate_figures_v5_corrected.py (v5) as a task and renders the tasks in a
+process pool. Workers use the non-interactive Agg backend, so savefig
+rasterization of the dpi=300 figures runs on all cores. The typed reforms
+database (models/reforms_data.py) is loaded once in the parent and handed
+to every worker at start-up; figure functions get a copy through
+`load_reforms_data()`. With --db the database is read from a
+reforms_store SQLite file instead of the CSV.
+
+Builds are incremental. Each task declares its inputs (data files, module
+constants such as COLORS, helper functions) and its fingerprint hashes
+those together with the source of the figure function, which also covers
+the `cli_scores` tables defined inside it, and the module-level style
+setup. Fingerprints of the last successful build are kept in
+figures_manifest.json next to figures/; a figure is re-rendered only when
+its fingerprint changed or its PNG is missing.
+
+Usage:
+    python figure_pipeline.py [--jobs N] [--force] [--db reforms.sqlite] [--only figure1_reform_timeline ...]
+
+Author: Ignacio Adrián Lerer
+Date: October 2025
+"""
+
+import argparse
+import ast
+import hashlib
+import importlib
+import inspect
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.normpath(os.path.join(SCRIPTS_DIR, '..'))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'models'))
+from reforms_data import load_reforms
+
+DATA_PATH = os.path.join(ROOT_DIR, 'data', 'historical_reforms_database.csv')
+FIGURES_DIR = os.path.join(ROOT_DIR, 'figures')
+MANIFEST_PATH = os.path.join(ROOT_DIR, 'figures_manifest.json')
+
+# Inputs shared by the figures that read the reforms database
+REFORMS_INPUTS = ('data/historical_reforms_database.csv', 'models/reforms_data.py', 'models/survival.py')
+CLASSIFIER_INPUTS = ('data/classification_rules.json', 'models/reform_classifier.py')
+# Extra inputs of those figures when the database comes from a SQLite store
+STORE_INPUTS = ('models/reforms_store.py',)
+
+
+@dataclass(frozen=True)
+class FigureTask:
+    """
+    One figure function, the PNG it writes to figures/ and its inputs.
+
+    `inputs` are file paths relative to the repository root, `constants`
+    and `helpers` are names of module globals and module functions the
+    figure depends on besides its own source.
+    """
+    module: str
+    function: str
+    output: str
+    inputs: Tuple[str, ...] = ()
+    constants: Tuple[str, ...] = ()
+    helpers: Tuple[str, ...] = ()
+
+    @property
+    def name(self) -> str:
+        return self.function
+
+    def load(self):
+        return getattr(importlib.import_module(self.module), self.function)
+
+
+TASKS: List[FigureTask] = [
+    FigureTask('generate_labor_figures', 'figure1_reform_timeline', 'figure1_reform_timeline.png',
+               inputs=REFORMS_INPUTS + CLASSIFIER_INPUTS, constants=('COLORS',), helpers=('load_reforms_data',)),
+    FigureTask('generate_labor_figures', 'figure2_cli_comparison', 'figure2_cli_comparison.png',
+               constants=('COLORS',)),
+    FigureTask('generate_labor_figures', 'figure3_reform_success_comparison', 'figure3_success_comparison.png',
+               constants=('COLORS',)),
+    FigureTask('generate_labor_figures', 'figure4_time_to_reversal', 'figure4_time_to_reversal.png',
+               inputs=REFORMS_INPUTS, constants=('COLORS',),
+               helpers=('load_reforms_data',)),
+    FigureTask('generate_labor_figures', 'figure5_reform_mechanisms', 'figure5_failure_mechanisms.png',
+               inputs=REFORMS_INPUTS + CLASSIFIER_INPUTS, constants=('COLORS',), helpers=('load_reforms_data',)),
+    FigureTask('generate_figures_v5_corrected', 'figure2_cli_comparison_v5', 'figure2_cli_comparison_v5.png',
+               constants=('COLORS',)),
+    FigureTask('generate_figures_v5_corrected', 'figure3_reform_success_comparison_v5',
+               'figure3_success_comparison_v5.png', constants=('COLORS',)),
+    FigureTask('generate_figures_v5_corrected', 'create_comparison_sheet', 'cli_comparison_v4_vs_v5.png'),
+]
+
+
+def register(module: str, function: str, output: str, inputs: Iterable[str] = (),
+             constants: Iterable[str] = (), helpers: Iterable[str] = ()) -> FigureTask:
+    """Add a figure function and its declared inputs to the task registry."""
+    task = FigureTask(module, function, output, tuple(inputs), tuple(constants), tuple(helpers))
+    TASKS.append(task)
+    return task
+
+
+def tasks_for(module: Optional[str] = None, names: Optional[Iterable[str]] = None) -> List[FigureTask]:
+    """Registered tasks, optionally restricted to one script and/or function names."""
+    names = set(names) if names else None
+    unknown = names - {task.name for task in TASKS} if names else set()
+    if unknown:
+        raise ValueError(f"Unknown figures: {sorted(unknown)}")
+    return [task for task in TASKS
+            if (module is None or task.module == module) and (names is None or task.name in names)]
+
+
+# Reforms database shared with the figure functions of this process
+_shared_reforms: Optional[pd.DataFrame] = None
+
+
+def shared_reforms_data() -> pd.DataFrame:
+    """Copy of the preloaded, typed reforms database (loaded if none was shared)."""
+    if _shared_reforms is None:
+        return load_reforms(DATA_PATH).frame
+    return _shared_reforms.copy()
+
+
+def _init_worker(reforms: Optional[pd.DataFrame]):
+    """Select the Agg backend and install the shared data in a worker."""
+    import matplotlib
+    matplotlib.use('Agg')
+    # Figure functions save to ../figures relative to the scripts directory
+    os.chdir(SCRIPTS_DIR)
+    if SCRIPTS_DIR not in sys.path:
+        sys.path.insert(0, SCRIPTS_DIR)
+    # Set the data on the importable module, which is what the figure
+    # scripts see, even when this file runs as __main__
+    importlib.import_module('figure_pipeline')._shared_reforms = reforms
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _file_digest(path: str) -> str:
+    try:
+        with open(path, 'rb') as handle:
+            return _digest(handle.read())
+    except FileNotFoundError:
+        return 'missing'
+
+
+def _setup_source(module, constants: Iterable[str]) -> str:
+    """
+    Module-level statements other than definitions, declared constants and
+    the __main__ guard: imports and the seaborn/rcParams style setup.
+    """
+    skip = set(constants)
+    statements = []
+    for node in ast.parse(inspect.getsource(module)).body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            continue
+        if isinstance(node, ast.Assign) and {getattr(t, 'id', None) for t in node.targets} <= skip:
+            continue
+        if isinstance(node, ast.If) and '__main__' in ast.unparse(node.test):
+            continue
+        if isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant):
+            continue  # module docstring
+        statements.append(ast.unparse(node))
+    return '\n'.join(statements)
+
+
+def dependency_digests(task: FigureTask, db_path: Optional[str] = None) -> Dict[str, str]:
+    """
+    Hash of every declared input of a task.
+
+    Args:
+        task: Figure task
+        db_path: SQLite store the reforms database is read from, if any;
+            it is then an input of every task that reads the CSV
+
+    Returns:
+        Dict mapping 'code:<function>', 'setup:<module>', 'const:<name>',
+        'file:<path>' and 'db:<path>' to SHA-256 digests
+    """
+    module = importlib.import_module(task.module)
+    digests = {}
+    for name in (task.function, *task.helpers):
+        digests[f'code:{name}'] = _digest(inspect.getsource(getattr(module, name)).encode())
+    digests[f'setup:{task.module}'] = _digest(_setup_source(module, task.constants).encode())
+    for name in task.constants:
+        value = json.dumps(getattr(module, name), sort_keys=True, default=repr)
+        digests[f'const:{name}'] = _digest(value.encode())
+    inputs = task.inputs
+    if db_path is not None and REFORMS_INPUTS[0] in inputs:
+        inputs += STORE_INPUTS
+        digests[f'db:{os.path.abspath(db_path)}'] = _file_digest(db_path)
+    for path in inputs:
+        digests[f'file:{path}'] = _file_digest(os.path.join(ROOT_DIR, path))
+    return digests
+
+
+def fingerprint(digests: Dict[str, str]) -> str:
+    """Single fingerprint of a task's dependency digests."""
+    return _digest(json.dumps(digests, sort_keys=True).encode())
+
+
+def load_manifest(path: str = MANIFEST_PATH) -> Dict[str, Dict]:
+    """Fingerprints of the last successful build, keyed by output PNG."""
+    try:
+        with open(path) as handle:
+            return json.load(handle)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_manifest(manifest: Dict[str, Dict], path: str = MANIFEST_PATH):
+    temporary = path + '.tmp'
+    with open(temporary, 'w') as handle:
+        json.dump(manifest, handle, indent=2, sort_keys=True)
+        handle.write('\n')
+    os.replace(temporary, path)
+
+
+def rebuild_reason(task: FigureTask, digests: Dict[str, str], entry: Optional[Dict]) -> Optional[str]:
+    """Why a task must be re-rendered, or None if its output is up to date."""
+    if not os.path.exists(os.path.join(FIGURES_DIR, task.output)):
+        return 'output missing'
+    if entry is None:
+        return 'not in manifest'
+    if entry.get('fingerprint') == fingerprint(digests):
+        return None
+    previous = entry.get('inputs', {})
+    changed = sorted(key for key in digests.keys() | previous.keys()
+                     if digests.get(key) != previous.get(key))
+    return 'changed: ' + ', '.join(changed)
+
+
+def _render(task: FigureTask) -> Tuple[str, float]:
+    start = time.perf_counter()
+    task.load()()
+    return task.name, time.perf_counter() - start
+
+
+def run_figures(tasks: List[FigureTask], jobs: Optional[int] = None, force: bool = False,
+                manifest_path: str = MANIFEST_PATH, db_path: Optional[str] = None) -> pd.DataFrame:
+    """
+    Render out-of-date figure tasks in a process pool and report per-figure timing.
+
+    Tasks whose fingerprint matches the manifest and whose PNG exists are
+    skipped. The manifest is updated for every figure that rendered, also
+    when another figure of the build fails.
+
+    Args:
+        tasks: Tasks to consider
+        jobs: Worker processes (defaults to the CPU count; 1 renders in-process)
+        force: Re-render every task regardless of the manifest
+        manifest_path: Fingerprint manifest file
+        db_path: Read the reforms database from this SQLite store instead
+            of the CSV
+
+    Returns:
+        DataFrame with Figure, Output, Status and Seconds per task
+    """
+    os.makedirs(FIGURES_DIR, exist_ok=True)
+    # Fingerprinting imports the figure scripts in this process as well
+    cwd = os.getcwd()
+    _init_worker(None)
+    os.chdir(cwd)
+
+    manifest = load_manifest(manifest_path)
+    digests = {task.name: dependency_digests(task, db_path) for task in tasks}
+    status = {}
+    for task in tasks:
+        reason = 'forced' if force else rebuild_reason(task, digests[task.name], manifest.get(task.output))
+        status[task.name] = reason or 'up to date'
+    stale = [task for task in tasks if status[task.name] != 'up to date']
+    by_name = {task.name: task for task in tasks}
+
+    def record(name: str):
+        task = by_name[name]
+        manifest[task.output] = {'figure': f'{task.module}.{name}',
+                                 'fingerprint': fingerprint(digests[name]),
+                                 'inputs': digests[name]}
+
+    start = time.perf_counter()
+    timings = {}
+    jobs = min(jobs or os.cpu_count() or 1, max(len(stale), 1))
+    try:
+        if stale and jobs == 1:
+            _init_worker(load_reforms(DATA_PATH, db_path=db_path).frame)
+            try:
+                for task in stale:
+                    name, seconds = _render(task)
+                    timings[name] = seconds
+                    record(name)
+            finally:
+                os.chdir(cwd)
+        elif stale:
+            with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                     initargs=(load_reforms(DATA_PATH, db_path=db_path).frame,)) as executor:
+                futures = [executor.submit(_render, task) for task in stale]
+                for future in as_completed(futures):
+                    name, seconds = future.result()
+                    timings[name] = seconds
+                    record(name)
+    finally:
+        if timings:
+            save_manifest(manifest, manifest_path)
+    wall = time.perf_counter() - start
+
+    report = pd.DataFrame([{'Figure': task.name, 'Output': task.output, 'Status': status[task.name],
+                            'Seconds': timings.get(task.name, 0.0)} for task in tasks])
+    report = report.sort_values('Seconds', ascending=False, kind='stable')
+    print(f"\n{'Figure':45s} {'Seconds':>8s}  Status")
+    for _, row in report.iterrows():
+        print(f"{row['Figure']:45s} {row['Seconds']:8.2f}  {row['Status']}")
+    print(f"{len(stale)} of {len(tasks)} figures rendered in {wall:.2f} s wall time "
+          f"({report['Seconds'].sum():.2f} s of rendering, {jobs} worker{'s' if jobs > 1 else ''})")
+    return report
+
+
+def main():
+    """Render the full v4 + v5 figure set"""
+    parser = argparse.ArgumentParser(description='Parallel figure build')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='Worker processes (default: CPU count)')
+    parser.add_argument('--only', nargs='+', metavar='FIGURE',
+                        help='Render only these figure functions')
+    parser.add_argument('--force', action='store_true',
+                        help='Re-render even if the fingerprints are unchanged')
+    parser.add_argument('--db', metavar='SQLITE',
+                        help='Read the reforms database from this reforms_store file instead of the CSV')
+    args = parser.parse_args()
+
+    run_figures(tasks_for(names=args.only), args.jobs, args.force, db_path=args.db)
+
+
+if __name__ == '__main__':
+    main()
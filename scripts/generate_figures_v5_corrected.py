@@ -20,9 +20,13 @@ import seaborn as sns
 import pandas as pd
 import numpy as np
 from matplotlib.patches import Rectangle, FancyBboxPatch
+import argparse
+import os
 import warnings
 warnings.filterwarnings('ignore')
 
+from figure_pipeline import run_figures, tasks_for
+
 # Set style
 sns.set_style("whitegrid")
 plt.rcParams['figure.figsize'] = (14, 8)
@@ -335,6 +339,13 @@ KEY FINDINGS FROM v5 CORRECTIONS:
 
 def main():
     """Generate v5 corrected figures"""
+    parser = argparse.ArgumentParser(description='Generate the v5 corrected figures')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='Worker processes (default: CPU count)')
+    parser.add_argument('--force', action='store_true',
+                        help='Re-render even if the figure inputs are unchanged')
+    args = parser.parse_args()
+    
     print("\n" + "="*70)
     print("ARGENTINA LABOR REGIME ANALYSIS - v5 CLI CORRECTIONS")
     print("Regenerating Figures 2 and 3 with corrected CLI values")
@@ -348,16 +359,11 @@ def main():
     print("\n" + "-"*70 + "\n")
     
     # Create figures directory if it doesn't exist
-    import os
     os.makedirs('../figures', exist_ok=True)
     
     print("Generating corrected figures...\n")
     
-    figure2_cli_comparison_v5()
-    print()
-    figure3_reform_success_comparison_v5()
-    print()
-    create_comparison_sheet()
+    run_figures(tasks_for('generate_figures_v5_corrected'), args.jobs, args.force)
     
     print("\n" + "="*70)
     print("✓ ALL v5 CORRECTED FIGURES GENERATED SUCCESSFULLY")
@@ -14,9 +14,17 @@ import pandas as pd
 import numpy as np
 from matplotlib.patches import Rectangle
 from datetime import datetime
+import argparse
+import os
+import sys
 import warnings
 warnings.filterwarnings('ignore')
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'models'))
+from reform_classifier import classify
+from survival import load_survival_data, median_survival, survival_table
+from figure_pipeline import run_figures, shared_reforms_data, tasks_for
+
 # Set style
 sns.set_style("whitegrid")
 plt.rcParams['figure.figsize'] = (14, 8)
@@ -37,9 +45,8 @@ COLORS = {
 }
 
 def load_reforms_data():
-    """Load historical reforms database"""
-    df = pd.read_csv('../data/historical_reforms_database.csv')
-    return df
+    """Load historical reforms database (shared copy when run by the figure pipeline)"""
+    return shared_reforms_data()
 
 def figure1_reform_timeline():
     """
@@ -51,17 +58,8 @@ def figure1_reform_timeline():
     # Exclude the prediction row (R23)
     df_plot = df[df['reform_id'] != 'R23'].copy()
     
-    # Map outcomes to colors
-    outcome_colors = []
-    for outcome in df_plot['final_outcome']:
-        if 'Failed' in outcome or 'reversed' in outcome:
-            outcome_colors.append(COLORS['failed'])
-        elif 'Success' in outcome:
-            outcome_colors.append(COLORS['success'])
-        elif 'Partial' in outcome:
-            outcome_colors.append(COLORS['partial'])
-        else:
-            outcome_colors.append(COLORS['pending'])
+    # Map outcomes to colors (rules in data/classification_rules.json)
+    outcome_colors = [COLORS[outcome] for outcome in classify(df_plot, 'outcome_color')['category']]
     
     fig, ax = plt.subplots(figsize=(16, 10))
     
@@ -285,24 +283,17 @@ def figure3_reform_success_comparison():
 def figure4_time_to_reversal():
     """
     Figure 4: Survival Analysis - Time to Reversal of Argentine Reforms
-    Kaplan-Meier style curves showing how quickly reforms get reversed
+    Kaplan-Meier curve of how quickly reforms get reversed; reforms still
+    in force (e.g. "Active (15 months so far)") are right-censored
     """
-    df = load_reforms_data()
-    
-    # Convert time_to_reversal_months to numeric, coercing errors to NaN
-    df['time_to_reversal_months'] = pd.to_numeric(df['time_to_reversal_months'], errors='coerce')
-    
-    # Filter only reforms that were reversed (have time_to_reversal_months)
-    df_reversed = df[df['time_to_reversal_months'].notna() & 
-                     (df['time_to_reversal_months'] > 0)].copy()
-    
-    # Sort by time to reversal
-    df_reversed = df_reversed.sort_values('time_to_reversal_months')
+    data = load_survival_data(df=load_reforms_data())
+    km = survival_table(data)
+    median_time = median_survival(km).iloc[0]
     
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 7))
     
-    # Left: Histogram of time to reversal
-    times = df_reversed['time_to_reversal_months']
+    # Left: Histogram of observed times to reversal
+    times = data.loc[data['event'], 'duration']
     ax1.hist(times, bins=12, color=COLORS['failed'], alpha=0.7, edgecolor='black')
     ax1.axvline(times.mean(), color='blue', linestyle='--', linewidth=2, 
                 label=f'Mean: {times.mean():.1f} months')
@@ -315,22 +306,24 @@ def figure4_time_to_reversal():
     ax1.legend(fontsize=10)
     ax1.grid(axis='y', alpha=0.3)
     
-    # Right: Survival curve (Kaplan-Meier approximation)
-    times_sorted = sorted(times)
-    n_total = len(times_sorted)
-    survival_probs = [(n_total - i) / n_total for i in range(n_total)]
-    
-    # Add starting point
-    times_sorted = [0] + times_sorted
-    survival_probs = [1.0] + survival_probs
+    # Right: Kaplan-Meier survival curve with Greenwood 95% CI
+    curve_times = np.concatenate([[0], km['time']])
+    survival = np.concatenate([[1.0], km['survival']])
+    ci_lower = np.concatenate([[1.0], km['ci_lower']])
+    ci_upper = np.concatenate([[1.0], km['ci_upper']])
     
-    ax2.step(times_sorted, survival_probs, where='post', color=COLORS['argentina'], 
+    ax2.step(curve_times, survival, where='post', color=COLORS['argentina'], 
              linewidth=3, label='Argentine Reforms')
-    ax2.fill_between(times_sorted, survival_probs, step='post', 
-                     alpha=0.3, color=COLORS['argentina'])
+    ax2.fill_between(curve_times, ci_lower, ci_upper, step='post', 
+                     alpha=0.3, color=COLORS['argentina'], label='95% CI (Greenwood)')
+    
+    # Mark censored reforms (still in force) on the curve
+    censored = km[km['censored'] > 0]
+    if len(censored):
+        ax2.plot(censored['time'], censored['survival'], '+', color='black', 
+                 markersize=14, markeredgewidth=2, label='Censored (still active)')
     
     # Add median survival time line
-    median_time = times.median()
     ax2.axvline(median_time, color='black', linestyle='--', linewidth=2, 
                 label=f'Median Survival: {median_time:.0f} months')
     ax2.axhline(0.5, color='gray', linestyle=':', alpha=0.5)
@@ -339,7 +332,7 @@ def figure4_time_to_reversal():
     ax2.set_ylabel('Survival Probability', fontsize=12, fontweight='bold')
     ax2.set_title('Kaplan-Meier Survival Curve: Argentine Labor Reforms', 
                  fontsize=13, fontweight='bold')
-    ax2.set_xlim(0, max(times_sorted) + 5)
+    ax2.set_xlim(0, curve_times.max() + 5)
     ax2.set_ylim(0, 1.05)
     ax2.legend(fontsize=10)
     ax2.grid(True, alpha=0.3)
@@ -349,8 +342,8 @@ def figure4_time_to_reversal():
             fontsize=9, bbox=dict(boxstyle='round', facecolor='yellow', alpha=0.5))
     
     plt.suptitle('Figure 4: Time to Reversal of Argentine Labor Reforms (1991-2025)\n' +
-                 f'Average: {times.mean():.1f} months | Median: {times.median():.1f} months | ' +
-                 f'n = {len(df_reversed)} reversed reforms',
+                 f'Average: {times.mean():.1f} months | KM Median: {median_time:.0f} months | ' +
+                 f'n = {int(data["event"].sum())} reversed, {int((~data["event"]).sum())} censored',
                  fontsize=14, fontweight='bold', y=1.00)
     
     plt.tight_layout()
@@ -365,38 +358,11 @@ def figure5_reform_mechanisms():
     """
     df = load_reforms_data()
     
-    # Categorize reversal mechanisms
-    mechanism_categories = {
-        'Constitutional/Judicial': [],
-        'Political': [],
-        'Union Veto': [],
-        'Federal Courts': [],
-        'Multiple': []
-    }
-    
-    for _, row in df.iterrows():
-        if pd.isna(row['reversal_mechanism']):
-            continue
-        
-        mechanism = str(row['reversal_mechanism']).lower()
-        lock_dim = str(row['lock_in_dimension']).lower()
-        
-        if 'csjn' in mechanism or 'constitutional' in mechanism or 'judicial' in lock_dim:
-            if '+' in lock_dim or 'multiple' in mechanism:
-                mechanism_categories['Multiple'].append(row)
-            else:
-                mechanism_categories['Constitutional/Judicial'].append(row)
-        elif 'political' in mechanism or 'deadlock' in mechanism or 'legislative' in mechanism:
-            mechanism_categories['Political'].append(row)
-        elif 'union' in mechanism or 'cgt' in mechanism:
-            mechanism_categories['Union Veto'].append(row)
-        elif 'federal' in mechanism or 'provincial' in mechanism:
-            mechanism_categories['Federal Courts'].append(row)
-        else:
-            mechanism_categories['Multiple'].append(row)
+    # Categorize reversal mechanisms (rules in data/classification_rules.json)
+    mechanisms = classify(df, 'reversal_mechanism')['category']
     
     # Count mechanisms
-    counts = {k: len(v) for k, v in mechanism_categories.items() if len(v) > 0}
+    counts = {k: v for k, v in mechanisms.value_counts(sort=False).items() if v > 0}
     
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 7))
     
@@ -424,19 +390,12 @@ def figure5_reform_mechanisms():
         'Milei': (2023, 2025)
     }
     
-    gov_attempts = {k: 0 for k in governments.keys()}
-    gov_failures = {k: 0 for k in governments.keys()}
-    
-    for _, row in df.iterrows():
-        gov = row['government']
-        if gov in gov_attempts:
-            gov_attempts[gov] += 1
-            if 'Failed' in str(row['final_outcome']) or 'reversed' in str(row['final_outcome']).lower():
-                gov_failures[gov] += 1
+    failed = classify(df, 'failure')['category'].eq('Failed')
+    government = df['government'].astype(str)
     
     x_pos = np.arange(len(governments))
-    attempts = [gov_attempts[g] for g in governments.keys()]
-    failures = [gov_failures[g] for g in governments.keys()]
+    attempts = government.value_counts().reindex(list(governments), fill_value=0).tolist()
+    failures = government[failed].value_counts().reindex(list(governments), fill_value=0).tolist()
     
     ax2.bar(x_pos, attempts, label='Total Attempts', alpha=0.5, color='gray', edgecolor='black')
     ax2.bar(x_pos, failures, label='Failures', alpha=0.8, color=COLORS['failed'], edgecolor='black')
@@ -466,22 +425,26 @@ def figure5_reform_mechanisms():
 
 def main():
     """Generate all figures"""
+    parser = argparse.ArgumentParser(description='Generate the v4 paper figures')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='Worker processes (default: CPU count)')
+    parser.add_argument('--force', action='store_true',
+                        help='Re-render even if the figure inputs are unchanged')
+    parser.add_argument('--db', metavar='SQLITE',
+                        help='Read the reforms database from a reforms_store file instead of the CSV')
+    args = parser.parse_args()
+    
     print("\n" + "="*60)
     print("ARGENTINA LABOR REGIME ANALYSIS - FIGURE GENERATION")
     print("Constitutional Lock-in and the Phenotypic Expression")
     print("="*60 + "\n")
     
     # Create figures directory if it doesn't exist
-    import os
     os.makedirs('../figures', exist_ok=True)
     
     print("Generating figures...\n")
     
-    figure1_reform_timeline()
-    figure2_cli_comparison()
-    figure3_reform_success_comparison()
-    figure4_time_to_reversal()
-    figure5_reform_mechanisms()
+    run_figures(tasks_for('generate_labor_figures'), args.jobs, args.force, db_path=args.db)
     
     print("\n" + "="*60)
     print("✓ ALL FIGURES GENERATED SUCCESSFULLY")
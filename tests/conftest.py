@@ -0,0 +1,14 @@
+"""
+Shared pytest setup: the model modules import each other by bare name,
+so the models/ directory goes on sys.path as the scripts do.
+
+Author: Adrian Lerer
+Date: 2025-10-17
+"""
+
+import os
+import sys
+
+MODELS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'models')
+if MODELS_DIR not in sys.path:
+    sys.path.insert(0, MODELS_DIR)
@@ -0,0 +1,129 @@
+"""
+Tests of the Milei reform predictor's numerical engines: CPT lookups,
+vectorized, streaming, parallel and adaptive Monte Carlo, exact inference
+and CPT fill kernels.
+
+Author: Adrian Lerer
+Date: 2025-10-17
+"""
+
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from milei_reform_bayesian_predictor import (
+    CPT_FILL_KERNELS, NODE_NAMES, MileiReformPredictor, MonteCarloSummary,
+    _draw_samples, exact_success_probability, fill_cpt_values, hamming_fill_kernel,
+    logistic_fill_kernel
+)
+
+ALL_CONDITIONS = np.array(list(itertools.product([False, True], repeat=len(NODE_NAMES))))
+
+
+@pytest.fixture
+def model():
+    return MileiReformPredictor(cache=None)
+
+
+def test_cpt_lookup_and_batch_match_calculate_posterior(model):
+    expected = np.array([model.calculate_posterior(**dict(zip(NODE_NAMES, map(bool, row))))['success']
+                         for row in ALL_CONDITIONS])
+
+    np.testing.assert_array_equal(model.cpt_success.lookup(ALL_CONDITIONS), expected)
+    batch = model.calculate_posterior_batch(ALL_CONDITIONS)
+    np.testing.assert_array_equal(batch['success'], expected)
+    np.testing.assert_allclose(batch['failure'], 1 - expected)
+
+    frame = pd.DataFrame(ALL_CONDITIONS, columns=NODE_NAMES)
+    np.testing.assert_array_equal(model.calculate_posterior_batch(frame)['success'], expected)
+
+
+def test_vectorized_monte_carlo_mean_matches_exact(model):
+    exact = float(exact_success_probability(model._node_probabilities(), model.cpt_success.values))
+    samples = model.monte_carlo_simulation(n_simulations=400_000, seed=1)
+
+    # prob_success is the CPT value of each draw, success a Bernoulli of it
+    for column in ('prob_success', 'success'):
+        values = samples[column].to_numpy(dtype=float)
+        standard_error = values.std() / np.sqrt(len(values))
+        assert abs(values.mean() - exact) < 4 * standard_error
+    assert model.exact_inference()['mean'] == pytest.approx(exact)
+
+
+def test_exact_inference_matches_network_query(model):
+    exact = float(exact_success_probability(model._node_probabilities(), model.cpt_success.values))
+    assert model.query() == pytest.approx(exact)
+    assert model.query(**dict(zip(NODE_NAMES, map(bool, ALL_CONDITIONS[7])))) == \
+        pytest.approx(model.cpt_success.values[7])
+
+
+def test_monte_carlo_parallel_is_reproducible():
+    first = MileiReformPredictor(cache=None).monte_carlo_parallel(200_003, n_workers=2, seed=7,
+                                                                  chunk_size=50_000)
+    second = MileiReformPredictor(cache=None).monte_carlo_parallel(200_003, n_workers=2, seed=7,
+                                                                   chunk_size=50_000)
+
+    assert first.n_draws == 200_003
+    np.testing.assert_array_equal(first.cell_counts, second.cell_counts)
+    np.testing.assert_array_equal(first.success_counts, second.success_counts)
+
+
+def test_streaming_percentiles_match_numpy(model):
+    rng = np.random.default_rng(3)
+    summary = MonteCarloSummary.empty(model.cpt_success.values)
+    draws = []
+    for size in (1000, 2500, 17):
+        samples, cell_index = _draw_samples(rng, model._node_probabilities(), model.cpt_success.values, size)
+        summary.update(cell_index, samples['success'])
+        draws.append(samples['prob_success'])
+    draws = np.concatenate(draws)
+
+    for q in (0, 2.5, 25, 50, 75, 97.5, 100):
+        assert summary.percentile(q) == pytest.approx(np.percentile(draws, q))
+    assert summary.mean_prob_success == pytest.approx(draws.mean())
+    assert summary.prob_success_variance == pytest.approx(draws.var(ddof=1))
+
+
+@pytest.mark.parametrize('criterion', ['standard_error', 'ci_width'])
+def test_adaptive_monte_carlo_stops_at_tolerance(model, criterion):
+    tolerance = 0.005 if criterion == 'standard_error' else 0.02
+    summary = model.monte_carlo_adaptive(tolerance=tolerance, criterion=criterion,
+                                         batch_size=1000, seed=5)
+
+    assert getattr(summary, criterion) <= tolerance
+    assert summary.n_draws < 10_000_000
+    # It stopped at the first batch that reached the tolerance
+    assert (summary.trace[criterion].iloc[:-1] >= tolerance).all()
+    assert summary.trace['n_draws'].iloc[-1] == summary.n_draws
+
+
+def test_adaptive_monte_carlo_respects_max_simulations(model):
+    summary = model.monte_carlo_adaptive(tolerance=1e-6, batch_size=3000, max_simulations=10_000, seed=5)
+    assert summary.n_draws == 10_000
+
+
+@pytest.mark.parametrize('kernel', sorted(CPT_FILL_KERNELS))
+def test_fill_kernels_keep_known_cells(model, kernel):
+    known = model.cpt_specified
+    specified = np.where(known, model.cpt_success.values, np.nan)
+    filled = fill_cpt_values(specified, kernel)
+
+    np.testing.assert_array_equal(filled[known], specified[known])
+    assert np.all((filled >= 0) & (filled <= 1))
+
+
+def test_fill_kernels_reproduce_known_cells_when_queried(model):
+    cells = np.flatnonzero(model.cpt_specified)
+    values = model.cpt_success.values[cells]
+    np.testing.assert_allclose(hamming_fill_kernel(cells, values, cells, len(NODE_NAMES)), values)
+
+    # An exactly additive logit CPT is recovered by the logistic kernel
+    coef = np.array([-3.0, 1.2, 0.8, 0.5, -1.0, 0.3])
+    design = np.column_stack([np.ones(len(ALL_CONDITIONS)), ALL_CONDITIONS])
+    additive = 1 / (1 + np.exp(-(design @ coef)))
+    # Training cells must vary every parent: all cells with at most two parents True
+    train = np.flatnonzero(ALL_CONDITIONS.sum(axis=1) <= 2)
+    np.testing.assert_allclose(
+        logistic_fill_kernel(train, additive[train], np.arange(32), len(NODE_NAMES)), additive)
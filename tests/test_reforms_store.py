@@ -0,0 +1,59 @@
+"""
+The SQLite reforms store against the CSV loader: same frame layout, and
+rows keep their import order when they are re-imported.
+
+Author: Adrian Lerer
+Date: 2025-10-17
+"""
+
+import pandas as pd
+import pytest
+
+from reforms_data import DATA_PATH, load_reforms
+from reforms_store import ReformsStore
+
+
+@pytest.fixture
+def store_path(tmp_path):
+    path = str(tmp_path / 'reforms.sqlite')
+    with ReformsStore(path) as store:
+        store.import_csv(DATA_PATH)
+    return path
+
+
+def test_store_frame_matches_csv_loader(store_path):
+    expected = load_reforms(cache_dir=None).frame
+    actual = load_reforms(db_path=store_path).frame
+
+    pd.testing.assert_frame_equal(actual, expected)
+    assert all(type(token) is str for tokens in actual['lock_in_dimensions'] for token in tokens)
+
+
+def test_reimport_keeps_row_order(store_path):
+    raw = pd.read_csv(DATA_PATH)
+    changed = raw.iloc[[5, 2]].copy()
+    changed['scope'] = 'Provincial'
+    with ReformsStore(store_path) as store, store.connection:
+        store.import_frame(changed)
+
+    frame = load_reforms(db_path=store_path).frame
+    assert frame['reform_id'].tolist() == raw['reform_id'].tolist()
+    assert frame.loc[[2, 5], 'scope'].tolist() == ['Provincial', 'Provincial']
+
+
+def test_store_cache_and_filters(store_path, tmp_path):
+    cached = load_reforms(cache_dir=str(tmp_path / 'cache'))
+    # Second load comes from the cache and still builds the indexes
+    reloaded = load_reforms(cache_dir=str(tmp_path / 'cache'))
+    pd.testing.assert_frame_equal(reloaded.frame, cached.frame)
+
+    with ReformsStore(store_path) as store:
+        assert store.counts('government').to_dict() == cached.counts('government').to_dict()
+        failed = store.select(['reform_id'], outcome='Failed', since=2015)['reform_id']
+    expected = cached.select(outcome='Failed')
+    assert sorted(failed) == sorted(expected.loc[expected['year'] >= 2015, 'reform_id'])
+
+
+def test_missing_store_is_an_error(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        load_reforms(db_path=str(tmp_path / 'missing.sqlite'))
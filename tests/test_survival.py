@@ -0,0 +1,62 @@
+"""
+Kaplan-Meier and Nelson-Aalen estimates of survival.py against hand
+computations.
+
+Author: Adrian Lerer
+Date: 2025-10-17
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from reforms_data import load_reforms
+from survival import load_survival_data, median_survival, survival_at, survival_table
+
+# Six reforms: reversals at 2, 3, 5 and 8 months, censored at 3 and 6
+DATA = pd.DataFrame({
+    'duration': [2.0, 3.0, 3.0, 5.0, 6.0, 8.0],
+    'event': [True, True, False, True, False, True],
+    'group': ['a', 'a', 'b', 'b', 'a', 'b']
+})
+
+
+def test_kaplan_meier_matches_hand_computation():
+    table = survival_table(DATA)
+
+    np.testing.assert_array_equal(table['time'], [2, 3, 5, 6, 8])
+    np.testing.assert_array_equal(table['at_risk'], [6, 5, 3, 2, 1])
+    np.testing.assert_array_equal(table['events'], [1, 1, 1, 0, 1])
+    np.testing.assert_array_equal(table['censored'], [0, 1, 0, 1, 0])
+    # S = 5/6, 5/6 * 4/5, 2/3 * 2/3, unchanged at the censoring, 0
+    np.testing.assert_allclose(table['survival'], [5 / 6, 2 / 3, 4 / 9, 4 / 9, 0.0])
+    # Greenwood: S(t) * sqrt(sum d / (n (n - d)))
+    assert table['std_err'].iloc[0] == pytest.approx(5 / 6 * np.sqrt(1 / 30))
+    assert table['std_err'].iloc[1] == pytest.approx(2 / 3 * np.sqrt(1 / 30 + 1 / 20))
+    # Nelson-Aalen: sum d / n
+    np.testing.assert_allclose(table['cumulative_hazard'],
+                               np.cumsum([1 / 6, 1 / 5, 1 / 3, 0, 1]))
+
+
+def test_stratified_curves_and_lookups():
+    table = survival_table(DATA, 'group')
+    # a: events at 2 and 3 among 3 subjects; b: censored at 3, events at 5 and 8
+    np.testing.assert_allclose(table.loc[table['stratum'] == 'a', 'survival'], [2 / 3, 1 / 3, 1 / 3])
+    np.testing.assert_allclose(table.loc[table['stratum'] == 'b', 'survival'], [1.0, 1 / 2, 0.0])
+
+    at = survival_at(table, [0, 2.5, 5, 10])
+    np.testing.assert_allclose(at.loc['a'], [1.0, 2 / 3, 1 / 3, 1 / 3])
+    np.testing.assert_allclose(at.loc['b'], [1.0, 1.0, 1 / 2, 0.0])
+    assert median_survival(table).to_dict() == {'a': 3.0, 'b': 5.0}
+
+
+def test_historical_reforms_curve():
+    data = load_survival_data(df=load_reforms(cache_dir=None).frame)
+    table = survival_table(data)
+
+    assert (len(data), int(data['event'].sum())) == (17, 15)
+    # Two of 17 reversed at 2 months; the last two steps are 1/2 and 0/1
+    assert table['survival'].iloc[0] == pytest.approx(15 / 17)
+    assert table['survival'].iloc[-2] == pytest.approx(table['survival'].iloc[-3] / 2)
+    assert table['survival'].iloc[-1] == 0.0
+    assert median_survival(table).iloc[0] == 12.0